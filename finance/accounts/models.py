@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 from app_user.models import CustomUser
 
@@ -28,6 +30,13 @@ class Account(models.Model):
 
     class Meta:
         unique_together = (("name", "user"),)
+        indexes = [
+            # Для фильтра account__name__icontains в списке транзакций.
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="account_name_trgm_idx",
+            ),
+        ]
         verbose_name = "счет"
         verbose_name_plural = "счета"
         ordering = ["name"]
@@ -1,3 +1,93 @@
-from django.test import TestCase
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, UTC
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import TransactionTestCase
+
+from accounts.models import Account
+from accounts.util import change_balances
+from app_user.models import CustomUser
+from transactions.models import Category, Transaction
+
+WORKERS = 8
+CHANGES_PER_WORKER = 25
+
+
+class ChangeBalancesConcurrencyTest(TransactionTestCase):
+    """
+    Параллельные изменения балансов из разных потоков (у каждого
+    свое соединение с базой) не теряют обновлений.
+    """
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user("balance@example.com")
+        self.card = Account.objects.create(name="Карта", user=self.user)
+        self.cash = Account.objects.create(name="Наличные", user=self.user)
+        self.category = Category.objects.create(
+            name="Зарплата", user=self.user, type_transaction="income"
+        )
+
+    def run_concurrently(self, worker) -> None:
+        """Запускает worker(номер) во всех потоках одновременно."""
+        barrier = threading.Barrier(WORKERS)
+
+        def run(number: int) -> None:
+            try:
+                barrier.wait()
+                for step in range(CHANGES_PER_WORKER):
+                    worker(number, step)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(WORKERS) as executor:
+            for future in [
+                executor.submit(run, number) for number in range(WORKERS)
+            ]:
+                future.result()
+
+    def test_parallel_transactions_on_one_account(self):
+        def add_income(number: int, step: int) -> None:
+            # Как TransactionView.perform_create: объект счета прочитан
+            # до изменения и к моменту UPDATE уже устарел.
+            account = Account.objects.get(pk=self.card.pk)
+            with transaction.atomic():
+                item = Transaction.objects.create(
+                    user=self.user,
+                    category=self.category,
+                    account=account,
+                    amount=Decimal(number + 1),
+                    create_at=datetime.now(UTC),
+                )
+                change_balances([(account, item.amount)])
+
+        self.run_concurrently(add_income)
+
+        ledger = Transaction.objects.filter(account=self.card)
+        self.assertEqual(ledger.count(), WORKERS * CHANGES_PER_WORKER)
+        expected = CHANGES_PER_WORKER * sum(range(1, WORKERS + 1))
+        self.assertEqual(
+            ledger.aggregate(total=Sum("amount"))["total"], expected
+        )
+        self.card.refresh_from_db()
+        self.assertEqual(self.card.balance, expected)
+
+    def test_opposite_transfers_do_not_deadlock(self):
+        def transfer(number: int, step: int) -> None:
+            source, destination = (
+                (self.card, self.cash) if number % 2 else
+                (self.cash, self.card)
+            )
+            change_balances([
+                (source, Decimal("-1.50")),
+                (destination, Decimal("1.50")),
+            ])
+
+        self.run_concurrently(transfer)
+
+        self.card.refresh_from_db()
+        self.cash.refresh_from_db()
+        self.assertEqual(self.card.balance, 0)
+        self.assertEqual(self.cash.balance, 0)
@@ -0,0 +1,43 @@
+from collections import defaultdict
+from decimal import Decimal
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F
+
+from accounts.models import Account
+
+
+def change_balances(changes: Iterable[tuple[Account, Decimal]]) -> None:
+    """
+    Изменяет балансы счетов на переданные суммы.
+    Каждый счет обновляется одним запросом
+    UPDATE ... SET balance = balance + %s, поэтому параллельные запросы
+    не перезаписывают изменения друг друга. После обновления балансы
+    переданных объектов счетов перечитываются из базы.
+
+    :param changes: Пары (счет, сумма изменения), сумма может
+                    быть отрицательной. Изменения одного счета суммируются.
+    """
+    deltas: dict[int, Decimal] = defaultdict(Decimal)
+    accounts: dict[int, list[Account]] = defaultdict(list)
+    for account, amount in changes:
+        deltas[account.pk] += amount
+        accounts[account.pk].append(account)
+
+    with transaction.atomic():
+        # Одинаковый порядок обновления счетов исключает взаимные блокировки.
+        for account_id in sorted(deltas):
+            if deltas[account_id]:
+                Account.objects.filter(pk=account_id).update(
+                    balance=F("balance") + deltas[account_id]
+                )
+
+        balances = dict(
+            Account.objects
+            .filter(pk__in=accounts)
+            .values_list("pk", "balance")
+        )
+    for account_id, items in accounts.items():
+        for account in items:
+            account.balance = balances[account_id]
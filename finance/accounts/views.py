@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.db.models import QuerySet, Sum
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics, status
@@ -21,6 +22,9 @@ from accounts.serializers import (
     AccountToggleStatusSerializer,
     BaseAccountSerializer,
 )
+from analytics.cache import invalidate_user_analytics
+from transactions.models import Transaction
+from transactions.util import queryset_rollup_deltas, update_category_rollup
 
 
 class AccountPagination(PageNumberPagination):
@@ -135,6 +139,20 @@ class RetrieveUpdateDeleteAccount(generics.RetrieveUpdateDestroyAPIView):
         """
         return Account.objects.filter(user=self.request.user)
 
+    def perform_destroy(self, instance: Account) -> None:
+        """
+        Вместе со счетом удаляются его транзакции, поэтому вычитаем их
+        из сумм по категориям и сбрасываем кеш аналитики.
+        """
+        with transaction.atomic():
+            update_category_rollup(
+                queryset_rollup_deltas(
+                    Transaction.objects.filter(account=instance), sign=-1
+                )
+            )
+            instance.delete()
+            invalidate_user_analytics(self.request.user.id)
+
 
 @extend_schema(tags=["Accounts"])
 class ToggleAccountActiveStatusView(generics.UpdateAPIView):
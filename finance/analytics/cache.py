@@ -0,0 +1,72 @@
+import time
+from typing import Any, Callable
+
+from django.core.cache import caches
+from django.db import transaction
+
+ANALYTICS_CACHE_ALIAS = "analytics"
+
+
+def _version_key(user_id: int) -> str:
+    return f"analytics:version:{user_id}"
+
+
+def _new_version() -> int:
+    """
+    A version based on the current time, so a counter that was evicted
+    from the cache never restarts at a value that was already used.
+    """
+    return time.time_ns()
+
+
+def get_user_version(user_id: int) -> int:
+    """Return the current analytics cache version for a user."""
+    cache = caches[ANALYTICS_CACHE_ALIAS]
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id: int) -> None:
+    """
+    Invalidate every cached analytics response of a user.
+
+    The version is replaced with a new one instead of incremented: incr
+    of the file and local memory caches is a get followed by a set, so
+    two concurrent bumps could both write the same next version.
+    """
+    cache = caches[ANALYTICS_CACHE_ALIAS]
+    cache.set(_version_key(user_id), _new_version(), timeout=None)
+
+
+def invalidate_user_analytics(user_id: int) -> None:
+    """
+    Bump the user's cache version once the current database transaction
+    commits, so a concurrent request cannot cache data that is about
+    to change under the new version.
+    """
+    transaction.on_commit(lambda: bump_user_version(user_id))
+
+
+def get_or_compute(
+    user_id: int, name: str, params: tuple, compute: Callable[[], Any]
+) -> Any:
+    """
+    Return a cached analytics response or compute and store it.
+
+    The key contains the user's current version, so entries written before
+    the last invalidation are never read again and simply expire.
+    """
+    cache = caches[ANALYTICS_CACHE_ALIAS]
+    version = get_user_version(user_id)
+    key = ":".join(
+        ["analytics", name, str(user_id), str(version), *map(str, params)]
+    )
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data)
+    return data
@@ -5,30 +5,156 @@ from app_user.models import CustomUser
 from transactions.models import Transaction
 
 import os
+import re
+from datetime import datetime, UTC
+from weakref import WeakKeyDictionary
+
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.db import connection
 
+PARAMS_HEADER = re.compile(r"^--\s*params:(.*)$", re.MULTILINE)
+PLACEHOLDER = re.compile(r"%(%|s|\(\w+\)s)?")
+
+
+class SQLQuery:
+    """An SQL query loaded from a file with its declared parameter types."""
+
+    def __init__(self, name, sql, param_types):
+        self.name = name
+        self.sql = sql
+        self.param_types = param_types
+        self.statement_name = f"analytics_{name}"
+
+    @classmethod
+    def parse(cls, name, sql):
+        """
+        Parse a query file.
+
+        The file must declare its parameters in a header comment, e.g.
+        ``-- params: user_id bigint, year integer``, one entry per
+        ``%s`` placeholder in order. Only positional placeholders
+        are supported, a literal percent sign is written as ``%%``.
+        """
+        header = PARAMS_HEADER.search(sql)
+        if header is None:
+            raise ImproperlyConfigured(
+                f"SQL query '{name}' has no '-- params:' header."
+            )
+        param_types = [
+            param.split(maxsplit=1)[1].strip()
+            for param in header.group(1).split(",")
+            if param.strip()
+        ]
+
+        placeholders = 0
+        for match in PLACEHOLDER.finditer(sql):
+            if match.group(1) == "s":
+                placeholders += 1
+            elif match.group(1) != "%":
+                raise ImproperlyConfigured(
+                    f"SQL query '{name}' has an unsupported placeholder "
+                    f"'{match.group(0)}', use %s or %%."
+                )
+        if placeholders != len(param_types):
+            raise ImproperlyConfigured(
+                f"SQL query '{name}' declares {len(param_types)} params "
+                f"but has {placeholders} placeholders."
+            )
+        return cls(name, sql, param_types)
+
+    @property
+    def prepare_sql(self):
+        """PREPARE statement with %s placeholders replaced by $1, $2..."""
+        numbers = iter(range(1, len(self.param_types) + 1))
+        body = PLACEHOLDER.sub(
+            lambda match: "%" if match.group(1) == "%" else f"${next(numbers)}",
+            self.sql,
+        )
+        types = f"({', '.join(self.param_types)})" if self.param_types else ""
+        return f"PREPARE {self.statement_name}{types} AS {body}"
+
+    @property
+    def execute_sql(self):
+        if not self.param_types:
+            return f"EXECUTE {self.statement_name}"
+        placeholders = ", ".join(["%s"] * len(self.param_types))
+        return f"EXECUTE {self.statement_name}({placeholders})"
+
+
 class SQLQueryService:
     """A class for an sql query for analytics."""
-    @staticmethod
-    def load_query(query_name):
-        """Load SQL from a file."""
-        query_path = os.path.join(
-            settings.BASE_DIR,
-            'analytics',
-            'queries',
-            f'{query_name}.sql'
-        )
-        with open(query_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    _queries: dict[str, SQLQuery] = {}
+    # Names of statements prepared on each raw database connection.
+    _prepared: WeakKeyDictionary = WeakKeyDictionary()
 
     @staticmethod
-    def execute_query(query_name, params=None):
-        """Execute SQL queries from a file."""
-        sql = SQLQueryService.load_query(query_name)
+    def queries_dir():
+        return os.path.join(settings.BASE_DIR, 'analytics', 'queries')
+
+    @classmethod
+    def load_queries(cls):
+        """Load and validate all SQL files, called once at app startup."""
+        queries = {}
+        for file_name in sorted(os.listdir(cls.queries_dir())):
+            name, extension = os.path.splitext(file_name)
+            if extension != '.sql':
+                continue
+            query_path = os.path.join(cls.queries_dir(), file_name)
+            with open(query_path, 'r', encoding='utf-8') as f:
+                queries[name] = SQLQuery.parse(name, f.read())
+        cls._queries = queries
+
+    @classmethod
+    def get_query(cls, query_name):
+        if not cls._queries:
+            cls.load_queries()
+        try:
+            return cls._queries[query_name]
+        except KeyError:
+            raise ValueError(f"Unknown SQL query '{query_name}'.")
+
+    @classmethod
+    def load_query(cls, query_name):
+        """Return the SQL text of a loaded query."""
+        return cls.get_query(query_name).sql
+
+    @classmethod
+    def execute_query(cls, query_name, params=None):
+        """Execute a loaded SQL query."""
+        query = cls.get_query(query_name)
+        params = list(params or [])
+        if len(params) != len(query.param_types):
+            raise ValueError(
+                f"SQL query '{query_name}' expects "
+                f"{len(query.param_types)} params, got {len(params)}."
+            )
+
         with connection.cursor() as cursor:
-            cursor.execute(sql, params or [])
-            return SQLQueryService._dictfetchall(cursor)
+            if cls._use_prepared_statements():
+                cls._execute_prepared(cursor, query, params)
+            else:
+                cursor.execute(query.sql, params)
+            return cls._dictfetchall(cursor)
+
+    @staticmethod
+    def _use_prepared_statements():
+        return (
+            connection.vendor == 'postgresql'
+            and getattr(settings, 'ANALYTICS_PREPARED_STATEMENTS', False)
+        )
+
+    @classmethod
+    def _execute_prepared(cls, cursor, query, params):
+        """
+        Execute a query as a server-side prepared statement, so
+        PostgreSQL parses and plans it once per connection.
+        """
+        prepared = cls._prepared.setdefault(connection.connection, set())
+        if query.statement_name not in prepared:
+            cursor.execute(query.prepare_sql)
+            prepared.add(query.statement_name)
+        cursor.execute(query.execute_sql, params)
 
     @staticmethod
     def _dictfetchall(cursor):
@@ -36,11 +162,48 @@ class SQLQueryService:
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
 
+def year_bounds(year=None):
+    """
+    Return a half-open [start, end) UTC range for a year,
+    or an unbounded range when the year is not given.
+    """
+    if year is None:
+        return '-infinity', 'infinity'
+    return (
+        datetime(int(year), 1, 1, tzinfo=UTC),
+        datetime(int(year) + 1, 1, 1, tzinfo=UTC),
+    )
+
+
 class MonthlyAnalyticsService:
     """A service for making a request for analytics."""
     @staticmethod
     def get_analytics(user_id, year=None, type_tr='expense'):
+        start, end = year_bounds(year)
         return SQLQueryService.execute_query(
             'monthly_analytics', 
-            [user_id, type_tr, year, year]
+            [user_id, type_tr, start, end]
+        )
+
+
+def month_bounds(start, end):
+    """
+    Return a half-open [start, end) UTC range covering the months
+    from ``start`` to ``end`` inclusive.
+    """
+    end_year, end_month = divmod(end.month, 12)
+    return (
+        datetime(start.year, start.month, 1, tzinfo=UTC),
+        datetime(end.year + end_year, end_month + 1, 1, tzinfo=UTC),
+    )
+
+
+class RangeAnalyticsService:
+    """A service for income, expense and net analytics over a month range."""
+    @staticmethod
+    def get_analytics(user_id, start, end):
+        range_start, range_end = month_bounds(start, end)
+        return SQLQueryService.execute_query(
+            'range_analytics',
+            [user_id, range_start, range_end, range_start, range_end]
         )
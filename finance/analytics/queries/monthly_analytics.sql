@@ -1,8 +1,8 @@
 -- Рассчет аналитики по месяцам.
+-- params: user_id bigint, type_transaction varchar, start timestamptz, end timestamptz
 WITH monthly_stats AS (
     SELECT 
-        EXTRACT(YEAR FROM t.create_at) as year,
-        EXTRACT(MONTH FROM t.create_at) as month,
+        date_trunc('month', t.create_at) as period_start,
         SUM(t.amount) as total_amount,
         COUNT(t.id) as transaction_count,
         AVG(t.amount) as avg_amount,
@@ -12,15 +12,16 @@ WITH monthly_stats AS (
     INNER JOIN transactions_category c ON t.category_id = c.id
     WHERE t.user_id = %s 
         AND c.type_transaction = %s
-        AND (%s IS NULL OR EXTRACT(YEAR FROM t.create_at) = %s)
-    GROUP BY 
-        EXTRACT(YEAR FROM t.create_at),
-        EXTRACT(MONTH FROM t.create_at)
-    WINDOW w AS (ORDER BY EXTRACT(YEAR FROM t.create_at), EXTRACT(MONTH FROM t.create_at))
+        -- Полуоткрытый диапазон [начало, конец) использует индекс
+        -- (user_id, create_at), в отличие от EXTRACT(YEAR FROM ...).
+        AND t.create_at >= %s
+        AND t.create_at < %s
+    GROUP BY date_trunc('month', t.create_at)
+    WINDOW w AS (ORDER BY date_trunc('month', t.create_at))
 )
 SELECT 
-    year::integer,
-    month::integer,
+    EXTRACT(YEAR FROM period_start)::integer as year,
+    EXTRACT(MONTH FROM period_start)::integer as month,
     total_amount,
     transaction_count,
     avg_amount,
@@ -37,4 +38,4 @@ SELECT
         ELSE NULL
     END as change_vs_prev_percent
 FROM monthly_stats
-ORDER BY year, month
+ORDER BY period_start
@@ -0,0 +1,33 @@
+-- Доходы, расходы и баланс по месяцам за произвольный период.
+-- Один проход по транзакциям, типы разделяются через FILTER.
+-- params: user_id bigint, start timestamptz, end timestamptz, start timestamptz, end timestamptz
+WITH monthly_totals AS (
+    SELECT 
+        date_trunc('month', t.create_at) as period_start,
+        SUM(t.amount) FILTER (WHERE c.type_transaction = 'income') as income,
+        SUM(t.amount) FILTER (WHERE c.type_transaction = 'expense') as expense,
+        COUNT(t.id) FILTER (WHERE c.type_transaction = 'income') as income_count,
+        COUNT(t.id) FILTER (WHERE c.type_transaction = 'expense') as expense_count
+    FROM transactions t
+    INNER JOIN transactions_category c ON t.category_id = c.id
+    WHERE t.user_id = %s 
+        AND t.create_at >= %s
+        AND t.create_at < %s
+    GROUP BY date_trunc('month', t.create_at)
+)
+SELECT 
+    EXTRACT(YEAR FROM m.period_start)::integer as year,
+    EXTRACT(MONTH FROM m.period_start)::integer as month,
+    COALESCE(mt.income, 0) as income,
+    COALESCE(mt.expense, 0) as expense,
+    COALESCE(mt.income, 0) - COALESCE(mt.expense, 0) as net,
+    COALESCE(mt.income_count, 0) as income_count,
+    COALESCE(mt.expense_count, 0) as expense_count
+-- Месяцы без транзакций возвращаются с нулями.
+FROM generate_series(
+    %s::timestamptz,
+    %s::timestamptz - interval '1 month',
+    interval '1 month'
+) as m(period_start)
+LEFT JOIN monthly_totals mt ON mt.period_start = m.period_start
+ORDER BY m.period_start
@@ -4,10 +4,14 @@ from drf_spectacular.utils import (
     extend_schema_view
 )
 
-from .serializers import FormattedMonthlyAnalyticsSerializer
+from .serializers import (
+    FormattedMonthlyAnalyticsSerializer,
+    RangeAnalyticsSerializer,
+)
 from transfer.serializers import (
     IsNotAuthentication,
-    NotFoundError
+    NotFoundError,
+    ValidationError,
 )
 
 
@@ -34,4 +38,29 @@ transaction_analytic_schema = extend_schema_view(
             404: NotFoundError,
         },
     )
-)
\ No newline at end of file
+)
+
+range_analytic_schema = extend_schema_view(
+    get=extend_schema(
+        operation_id="get_range_analytic_transactions",
+        tags=["Analytics"],
+        parameters=[
+            OpenApiParameter(
+                "start", str,
+                description="Первый месяц периода (YYYY-MM)",
+                required=True
+            ),
+            OpenApiParameter(
+                "end", str,
+                description="Последний месяц периода включительно (YYYY-MM)",
+                required=True
+            ),
+        ],
+        description="Доходы, расходы и баланс по месяцам за период.",
+        responses={
+            200: RangeAnalyticsSerializer,
+            400: ValidationError,
+            401: IsNotAuthentication,
+        },
+    )
+)
@@ -1,5 +1,81 @@
+import decimal
+from decimal import Decimal
+
 from rest_framework import serializers
 
+MONTH_NAMES = {
+    1: 'Январь', 2: 'Февраль', 3: 'Март', 4: 'Апрель',
+    5: 'Май', 6: 'Июнь', 7: 'Июль', 8: 'Август',
+    9: 'Сентябрь', 10: 'Октябрь', 11: 'Ноябрь', 12: 'Декабрь'
+}
+
+CENT = Decimal('0.01')
+
+
+def trend_description(change_percent) -> str:
+    if change_percent is None:
+        return '⇝'
+    elif change_percent > 10:
+        return '⇈'
+    elif change_percent > 0:
+        return '⇑'
+    elif change_percent == 0:
+        return '⇝'
+    elif change_percent > -10:
+        return '⇓'
+    else:
+        return '⇊'
+
+
+def format_monthly_analytics(rows) -> list[dict]:
+    """
+    Build FormattedMonthlyAnalyticsSerializer output in a single pass.
+
+    Produces exactly what ``FormattedMonthlyAnalyticsSerializer(rows,
+    many=True).data`` returns, without per-field method dispatch, so
+    the result can be cached and returned as is. The serializer is kept
+    as the schema of the response.
+    """
+    # Same quantization as DecimalField(max_digits=15, decimal_places=2).
+    context = decimal.getcontext().copy()
+    context.prec = 15
+
+    def amount(value):
+        return '{:f}'.format(Decimal(value).quantize(CENT, context=context))
+
+    results = []
+    for row in rows:
+        total = row['total_amount']
+        first = row['first_month_amount']
+        prev = row.get('prev_month_amount')
+        change_first = row.get('change_vs_first_percent', 0)
+        change_prev = row.get('change_vs_prev_percent')
+        results.append({
+            'year': row['year'],
+            'month': row['month'],
+            'period': f"{row['year']}-{row['month']:02d}",
+            'month_name': MONTH_NAMES.get(row['month'], 'Неизвестно'),
+            'total_amount': amount(total),
+            'transaction_count': row['transaction_count'],
+            'avg_amount': amount(row['avg_amount']),
+            'first_month_amount': amount(first),
+            'prev_month_amount': None if prev is None else amount(prev),
+            'change_vs_first_percent': (
+                round(change_first, 2) if change_first is not None else 0
+            ),
+            'change_vs_prev_percent': (
+                round(change_prev, 2) if change_prev is not None else 0
+            ),
+            'absolute_change_vs_first': round(total - first, 2),
+            'absolute_change_vs_prev': (
+                round(total - prev, 2) if prev is not None else 0
+            ),
+            'trend_vs_first': trend_description(change_first),
+            'trend_vs_prev': trend_description(change_prev),
+            'is_first_month': prev is None,
+        })
+    return results
+
 class FormattedMonthlyAnalyticsSerializer(serializers.Serializer):
     year = serializers.IntegerField()
     month = serializers.IntegerField()
@@ -40,12 +116,7 @@ class FormattedMonthlyAnalyticsSerializer(serializers.Serializer):
         return f"{obj['year']}-{obj['month']:02d}"
 
     def get_month_name(self, obj) -> str:
-        months = {
-            1: 'Январь', 2: 'Февраль', 3: 'Март', 4: 'Апрель',
-            5: 'Май', 6: 'Июнь', 7: 'Июль', 8: 'Август',
-            9: 'Сентябрь', 10: 'Октябрь', 11: 'Ноябрь', 12: 'Декабрь'
-        }
-        return months.get(obj['month'], 'Неизвестно')
+        return MONTH_NAMES.get(obj['month'], 'Неизвестно')
 
     def get_change_vs_first_percent(self, obj) -> float:
         percent = obj.get('change_vs_first_percent', 0)
@@ -78,15 +149,34 @@ class FormattedMonthlyAnalyticsSerializer(serializers.Serializer):
         return obj.get('prev_month_amount') is None
 
     def _get_trend_description(self, change_percent) -> str:
-        if change_percent is None:
-            return '⇝'
-        elif change_percent > 10:
-            return '⇈'
-        elif change_percent > 0:
-            return '⇑'
-        elif change_percent == 0:
-            return '⇝'
-        elif change_percent > -10:
-            return '⇓'
-        else:
-            return '⇊'
+        return trend_description(change_percent)
+
+
+class RangeAnalyticsMonthSerializer(serializers.Serializer):
+    year = serializers.IntegerField()
+    month = serializers.IntegerField()
+    period = serializers.SerializerMethodField()
+    month_name = serializers.SerializerMethodField()
+
+    income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+    net = serializers.DecimalField(max_digits=15, decimal_places=2)
+    income_count = serializers.IntegerField()
+    expense_count = serializers.IntegerField()
+
+    def get_period(self, obj) -> str:
+        return f"{obj['year']}-{obj['month']:02d}"
+
+    def get_month_name(self, obj) -> str:
+        return MONTH_NAMES.get(obj['month'], 'Неизвестно')
+
+
+class RangeAnalyticsTotalsSerializer(serializers.Serializer):
+    income = serializers.DecimalField(max_digits=15, decimal_places=2)
+    expense = serializers.DecimalField(max_digits=15, decimal_places=2)
+    net = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+class RangeAnalyticsSerializer(serializers.Serializer):
+    results = RangeAnalyticsMonthSerializer(many=True)
+    totals = RangeAnalyticsTotalsSerializer()
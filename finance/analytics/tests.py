@@ -1,3 +1,436 @@
-from django.test import TestCase
+from datetime import datetime
+from decimal import Decimal
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from app_user.models import CustomUser
+from transactions.models import Category, Transaction
+from .cache import get_user_version, invalidate_user_analytics
+from .filter import SQLQuery, SQLQueryService, year_bounds
+from .serializers import (
+    FormattedMonthlyAnalyticsSerializer,
+    format_monthly_analytics,
+)
+from .views import GetAnalyticForMonth
+
+MOSCOW = ZoneInfo("Europe/Moscow")
+
+LOCMEM_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    for alias in ("default", "analytics")
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AnalyticsCacheTest(TestCase):
+    """Кеш аналитики сбрасывается после изменения транзакций."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("cache@example.com")
+        cls.account = Account.objects.create(name="Карта", user=cls.user)
+        cls.food = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        cls.item = Transaction.objects.create(
+            user=cls.user,
+            category=cls.food,
+            account=cls.account,
+            amount=Decimal("10"),
+            create_at=datetime(2024, 5, 15, 12, tzinfo=MOSCOW),
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        compute = mock.patch.object(
+            GetAnalyticForMonth,
+            "compute_analytics",
+            wraps=GetAnalyticForMonth.compute_analytics,
+        )
+        self.compute = compute.start()
+        self.addCleanup(compute.stop)
+
+    def get_analytics(self) -> list:
+        response = self.client.get(
+            reverse("analytics"), {"year": 2024, "type": "expense"}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def change(self, method: str, url: str, data: dict | None = None):
+        """Изменение через API с выполнением колбэков on_commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 300, response.data)
+
+    def assertRecomputed(self, calls: int) -> None:
+        self.get_analytics()
+        self.get_analytics()
+        self.assertEqual(self.compute.call_count, calls)
+
+    def test_cached_until_transactions_change(self):
+        self.assertRecomputed(1)
+
+        self.change("post", reverse("incomes") + "?type=expense", {
+            "amount": "5",
+            "create_at": "2024-05-20T12:00:00+03:00",
+            "category": self.food.pk,
+            "account": self.account.pk,
+        })
+        self.assertRecomputed(2)
+
+        url = reverse("retrieve-update-delete-income", args=[self.item.pk])
+        self.change("patch", url, {"amount": "30"})
+        self.assertRecomputed(3)
+
+        self.change("delete", url)
+        self.assertRecomputed(4)
+
+    def test_version_changes_after_commit(self):
+        version = get_user_version(self.user.id)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_user_analytics(self.user.id)
+            self.assertEqual(get_user_version(self.user.id), version)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_user_version(self.user.id), version)
+        callbacks[0]()
+        self.assertNotEqual(get_user_version(self.user.id), version)
+
+    def test_each_bump_sets_a_new_version(self):
+        version = get_user_version(self.user.id)
+        versions = set()
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_user_analytics(self.user.id)
+            versions.add(get_user_version(self.user.id))
+
+        self.assertEqual(len(versions), 2)
+        self.assertNotIn(version, versions)
+
+
+class SQLQueryParseTest(SimpleTestCase):
+    """Разбор файлов SQL-запросов аналитики."""
+
+    def test_params_header(self):
+        query = SQLQuery.parse("example", (
+            "-- params: user_id bigint, start timestamptz\n"
+            "SELECT * FROM transactions\n"
+            "WHERE user_id = %s AND create_at >= %s\n"
+        ))
+
+        self.assertEqual(query.param_types, ["bigint", "timestamptz"])
+        self.assertEqual(query.statement_name, "analytics_example")
+
+    def test_missing_header(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "no '-- params:'"):
+            SQLQuery.parse("example", "SELECT %s")
+
+    def test_params_count_mismatch(self):
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "declares 2 params but has 1 placeholders"
+        ):
+            SQLQuery.parse(
+                "example", "-- params: a integer, b integer\nSELECT %s"
+            )
+
+    def test_named_placeholder(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'%(user_id)s'"):
+            SQLQuery.parse(
+                "example", "-- params: user_id bigint\nSELECT %(user_id)s"
+            )
+
+    def test_stray_percent(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "'%'"):
+            SQLQuery.parse(
+                "example",
+                "-- params: name text\nSELECT 1 WHERE %s LIKE 'a%'",
+            )
+
+    def test_prepare_sql(self):
+        query = SQLQuery.parse("example", (
+            "-- params: name text, amount numeric\n"
+            "SELECT 1 WHERE %s LIKE 'a%%' AND %s > 0"
+        ))
+
+        self.assertEqual(query.prepare_sql, (
+            "PREPARE analytics_example(text, numeric) AS "
+            "-- params: name text, amount numeric\n"
+            "SELECT 1 WHERE $1 LIKE 'a%' AND $2 > 0"
+        ))
+        self.assertEqual(
+            query.execute_sql, "EXECUTE analytics_example(%s, %s)"
+        )
+
+    def test_query_without_params(self):
+        query = SQLQuery.parse("example", "-- params:\nSELECT 100 %% 7")
+
+        self.assertEqual(query.param_types, [])
+        self.assertEqual(
+            query.prepare_sql,
+            "PREPARE analytics_example AS -- params:\nSELECT 100 % 7",
+        )
+        self.assertEqual(query.execute_sql, "EXECUTE analytics_example")
+
+    def test_wrong_params_count(self):
+        with self.assertRaisesMessage(
+            ValueError, "'monthly_analytics' expects 4 params, got 2"
+        ):
+            SQLQueryService.execute_query("monthly_analytics", [1, "expense"])
+
+    def test_unknown_query(self):
+        with self.assertRaisesMessage(ValueError, "Unknown SQL query"):
+            SQLQueryService.execute_query("missing", [])
+
+
+class SQLQueryExecuteTest(TestCase):
+    """Выполнение запросов аналитики с подготовленными выражениями и без."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("prepared@example.com")
+        account = Account.objects.create(name="Карта", user=cls.user)
+        category = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                category=category,
+                account=account,
+                amount=Decimal(amount),
+                create_at=datetime(2024, month, 10, 12, tzinfo=MOSCOW),
+            )
+            for month, amount in (
+                (1, "100"), (1, "50.50"), (2, "80"), (4, "120.25")
+            )
+        )
+
+    def execute(self) -> list[dict]:
+        return SQLQueryService.execute_query(
+            "monthly_analytics", [self.user.id, "expense", *year_bounds(2024)]
+        )
+
+    def prepare_queries(self, queries: CaptureQueriesContext) -> list:
+        return [
+            query["sql"] for query in queries
+            if query["sql"].startswith("PREPARE")
+        ]
+
+    def executed(self, queries: CaptureQueriesContext) -> list:
+        return [
+            query["sql"] for query in queries
+            if query["sql"].startswith("EXECUTE analytics_monthly_analytics")
+        ]
+
+    def test_same_rows_with_and_without_prepare(self):
+        with override_settings(ANALYTICS_PREPARED_STATEMENTS=False):
+            with CaptureQueriesContext(connection) as queries:
+                expected = self.execute()
+        self.assertEqual(self.prepare_queries(queries), [])
+        self.assertEqual(len(expected), 3)
+
+        with override_settings(ANALYTICS_PREPARED_STATEMENTS=True):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.execute(), expected)
+        self.assertEqual(len(self.executed(queries)), 1)
+
+    @override_settings(ANALYTICS_PREPARED_STATEMENTS=True)
+    def test_prepared_once_per_connection(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DEALLOCATE ALL")
+        SQLQueryService._prepared.pop(connection.connection, None)
+
+        with CaptureQueriesContext(connection) as queries:
+            first = self.execute()
+            second = self.execute()
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.prepare_queries(queries)), 1)
+        self.assertEqual(len(self.executed(queries)), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RangeAnalyticsTest(TestCase):
+    """Доходы, расходы и баланс по месяцам за период."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("range@example.com")
+        other = CustomUser.objects.create_user("other@example.com")
+        for user in (cls.user, other):
+            account = Account.objects.create(name="Карта", user=user)
+            categories = {
+                type_tr: Category.objects.create(
+                    name=type_tr, user=user, type_transaction=type_tr
+                )
+                for type_tr in ("income", "expense")
+            }
+            Transaction.objects.bulk_create(
+                Transaction(
+                    user=user,
+                    category=categories[type_tr],
+                    account=account,
+                    amount=Decimal(amount),
+                    create_at=datetime(year, month, 15, 12, tzinfo=MOSCOW),
+                )
+                for year, month, type_tr, amount in (
+                    (2023, 12, "income", "999"),
+                    (2024, 1, "income", "1000"),
+                    (2024, 1, "expense", "250.50"),
+                    (2024, 1, "expense", "49.50"),
+                    (2024, 3, "expense", "100"),
+                    (2024, 4, "income", "10.25"),
+                    (2024, 5, "expense", "999"),
+                )
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_range(self, **params):
+        return self.client.get(reverse("analytics-range"), params)
+
+    def assertBadRequest(self, **params) -> None:
+        response = self.get_range(**params)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.data)
+
+    def test_invalid_format(self):
+        self.assertBadRequest(start="2024-01")
+        self.assertBadRequest(start="2024-13", end="2024-12")
+        self.assertBadRequest(start="01.2024", end="2024-02")
+
+    def test_end_before_start(self):
+        self.assertBadRequest(start="2024-03", end="2024-02")
+
+    def test_range_limit(self):
+        self.assertBadRequest(start="2014-01", end="2024-01")
+        self.assertEqual(
+            self.get_range(start="2014-02", end="2024-01").status_code, 200
+        )
+
+    def test_months_and_totals(self):
+        response = self.get_range(start="2024-01", end="2024-04")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (
+                    item["period"],
+                    Decimal(item["income"]),
+                    Decimal(item["expense"]),
+                    Decimal(item["net"]),
+                    item["income_count"],
+                    item["expense_count"],
+                )
+                for item in response.data["results"]
+            ],
+            [
+                ("2024-01", Decimal("1000"), Decimal("300"), Decimal("700"),
+                 1, 2),
+                ("2024-02", 0, 0, 0, 0, 0),
+                ("2024-03", 0, Decimal("100"), Decimal("-100"), 0, 1),
+                ("2024-04", Decimal("10.25"), 0, Decimal("10.25"), 1, 0),
+            ],
+        )
+        self.assertEqual(
+            {
+                key: Decimal(value)
+                for key, value in response.data["totals"].items()
+            },
+            {
+                "income": Decimal("1010.25"),
+                "expense": Decimal("400"),
+                "net": Decimal("610.25"),
+            },
+        )
+
+    def test_empty_range_is_zero_filled(self):
+        response = self.get_range(start="2022-11", end="2023-02")
+
+        self.assertEqual(
+            [item["period"] for item in response.data["results"]],
+            ["2022-11", "2022-12", "2023-01", "2023-02"],
+        )
+        self.assertEqual(
+            [Decimal(item["net"]) for item in response.data["results"]],
+            [0, 0, 0, 0],
+        )
+        self.assertEqual(Decimal(response.data["totals"]["net"]), 0)
+
+
+def monthly_row(month: int, total: str, first: str, prev: str | None,
+                change_first, change_prev, avg: str | None = None) -> dict:
+    """Строка результата monthly_analytics.sql."""
+    return {
+        "year": 2024,
+        "month": month,
+        "total_amount": Decimal(total),
+        "transaction_count": month * 3,
+        "avg_amount": Decimal(avg or total),
+        "first_month_amount": Decimal(first),
+        "prev_month_amount": None if prev is None else Decimal(prev),
+        "change_vs_first_percent": change_first,
+        "change_vs_prev_percent": change_prev,
+    }
+
+
+class FormatMonthlyAnalyticsTest(SimpleTestCase):
+    """Быстрое форматирование совпадает с выводом сериализатора."""
+
+    rows = [
+        # Первый месяц: предыдущего нет.
+        monthly_row(1, "100.00", "100.00", None, Decimal("0"), None),
+        # Границы трендов: 0, +10, -10 и рядом с ними.
+        monthly_row(2, "110.00", "100.00", "100.00",
+                    Decimal("10.00"), Decimal("10.00")),
+        monthly_row(3, "99.00", "100.00", "110.00",
+                    Decimal("-1.00"), Decimal("-10.00")),
+        monthly_row(4, "99.00", "100.00", "99.00",
+                    Decimal("-1.00"), Decimal("0.00")),
+        monthly_row(5, "109.99", "100.00", "99.00",
+                    Decimal("9.99"), Decimal("11.1010101010101010")),
+        monthly_row(6, "98.99", "100.00", "109.99",
+                    Decimal("-1.01"), Decimal("-9.99999999999999999")),
+        monthly_row(7, "0.01", "100.00", "98.99",
+                    Decimal("-99.99"), Decimal("-99.9898979694918678")),
+        # Много знаков после запятой и округление половины.
+        monthly_row(8, "2.345", "100.00", "0.01",
+                    Decimal("-97.6550000000000000"),
+                    Decimal("23350.0000000000000000"),
+                    avg="0.78166666666666666667"),
+        monthly_row(9, "2.355", "2.345", "2.345",
+                    Decimal("0.426439232409381663"), Decimal("10.005"),
+                    avg="1234567890.125"),
+        # Процент не рассчитан.
+        monthly_row(10, "5.00", "5.00", "2.355", None, None),
+    ]
+
+    def test_same_as_serializer(self):
+        expected = FormattedMonthlyAnalyticsSerializer(
+            self.rows, many=True
+        ).data
+
+        self.assertEqual(
+            format_monthly_analytics(self.rows),
+            [dict(item) for item in expected],
+        )
+
+    def test_trends_are_covered(self):
+        trends = {
+            item["trend_vs_prev"]
+            for item in format_monthly_analytics(self.rows)
+        }
+        self.assertEqual(trends, {"⇝", "⇈", "⇑", "⇓", "⇊"})
@@ -1,7 +1,8 @@
 from django.urls import path
 
-from .views import GetAnalyticForMonth
+from .views import GetAnalyticForMonth, GetAnalyticForRange
 
 urlpatterns = [
     path("month/", GetAnalyticForMonth.as_view(), name="analytics"),
+    path("range/", GetAnalyticForRange.as_view(), name="analytics-range"),
 ]
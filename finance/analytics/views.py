@@ -1,4 +1,4 @@
-from datetime import datetime as dt, UTC
+from datetime import date, datetime as dt, UTC
 
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics
@@ -10,10 +10,13 @@ from rest_framework.authentication import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .serializers import FormattedMonthlyAnalyticsSerializer
+from .cache import get_or_compute
+from .serializers import RangeAnalyticsSerializer, format_monthly_analytics
 
-from .filter import MonthlyAnalyticsService
-from .schemas import transaction_analytic_schema
+from .filter import MonthlyAnalyticsService, RangeAnalyticsService
+from .schemas import range_analytic_schema, transaction_analytic_schema
+
+MAX_RANGE_MONTHS = 120
 
 
 @extend_schema(tags=["Analytics"])
@@ -47,14 +50,84 @@ class GetAnalyticForMonth(generics.GenericAPIView):
                 status=400
             )
 
-        analytics_service = MonthlyAnalyticsService()
-        analytics = analytics_service.get_analytics(
+        results = get_or_compute(
             request.user.id,
-            year,
-            type_tr
+            "monthly",
+            (year, type_tr),
+            lambda: self.compute_analytics(request.user.id, year, type_tr),
         )
-        analytics_list = list(analytics)        
-        serializer = FormattedMonthlyAnalyticsSerializer(
-            analytics_list, many=True
+        return Response({"results": results})
+
+    @staticmethod
+    def compute_analytics(user_id: int, year: int, type_tr: str) -> list:
+        """Run the analytics query and serialize the result."""
+        analytics_service = MonthlyAnalyticsService()
+        analytics = analytics_service.get_analytics(user_id, year, type_tr)
+        return format_monthly_analytics(analytics)
+
+
+def parse_month(value: str | None) -> date | None:
+    """Parse a YYYY-MM string into the first day of that month."""
+    try:
+        return dt.strptime(value, "%Y-%m").date()
+    except (TypeError, ValueError):
+        return None
+
+
+@extend_schema(tags=["Analytics"])
+@range_analytic_schema
+class GetAnalyticForRange(generics.GenericAPIView):
+    """Get income, expense and net analytics for a month range."""
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = (
+        TokenAuthentication,
+        BasicAuthentication,
+        SessionAuthentication,
+    )
+
+    def get(self, request, *args, **kwargs) -> Response:
+        """Get income, expense and net for every month of the range."""
+        start = parse_month(request.query_params.get("start"))
+        end = parse_month(request.query_params.get("end"))
+        if start is None or end is None:
+            return Response(
+                {"error": "Start and end must be months in YYYY-MM format."},
+                status=400
+            )
+
+        months = (end.year - start.year) * 12 + end.month - start.month + 1
+        if months < 1:
+            return Response(
+                {"error": "End must not be earlier than start."},
+                status=400
+            )
+        if months > MAX_RANGE_MONTHS:
+            return Response(
+                {"error": f"Range must not exceed {MAX_RANGE_MONTHS} months."},
+                status=400
+            )
+
+        data = get_or_compute(
+            request.user.id,
+            "range",
+            (start.isoformat(), end.isoformat()),
+            lambda: self.compute_analytics(request.user.id, start, end),
         )
-        return Response({"results": serializer.data})
+        return Response(data)
+
+    @staticmethod
+    def compute_analytics(user_id: int, start: date, end: date) -> dict:
+        """Run the range query and serialize the result with totals."""
+        analytics = RangeAnalyticsService.get_analytics(user_id, start, end)
+        income = sum(item["income"] for item in analytics)
+        expense = sum(item["expense"] for item in analytics)
+        serializer = RangeAnalyticsSerializer({
+            "results": analytics,
+            "totals": {
+                "income": income,
+                "expense": expense,
+                "net": income - expense,
+            },
+        })
+        return serializer.data
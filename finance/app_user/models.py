@@ -32,5 +32,9 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
 
+    def __bool__(self):
+        # Без __bool__ проверка "if user" вызывает __len__ (COUNT(*)).
+        return True
+
     def __len__(self):
         return CustomUser.objects.count()
@@ -4,6 +4,7 @@ from django.utils import timezone
 from django.db import transaction
 
 from accounts.models import Account
+from accounts.util import change_balances
 from app_user.models import CustomUser
 from debt.models import Debt
 from transfer.models import Transfer
@@ -49,14 +50,10 @@ def update_amount_accounts(
     :param destination: Счет на который будем переводить.
     :param data: Словарь с данными.
     """
-    if data.get("type") == "debt":
-        source.balance += data["amount"]
-        destination.balance -= data["amount"]
-
-    else:
-        source.balance -= data["amount"]
-        destination.balance += data["amount"]
-    source.save(), destination.save()
+    amount = data["amount"]
+    if data.get("type") != "debt":
+        amount = -amount
+    change_balances([(source, amount), (destination, -amount)])
 
 
 def create_debt_or_lend_transfer(user: CustomUser, data: dict) -> tuple:
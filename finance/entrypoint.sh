@@ -1,4 +1,11 @@
 #!/bin/sh
 
 python3 manage.py migrate
-gunicorn --bind 0.0.0.0:8001 finance.wsgi:application
+if [ "$SERVER_MODE" = "asgi" ]; then
+    gunicorn --bind 0.0.0.0:8001 \
+        -k uvicorn.workers.UvicornWorker \
+        -w "${WEB_CONCURRENCY:-4}" \
+        finance.asgi:application
+else
+    gunicorn --bind 0.0.0.0:8001 finance.wsgi:application
+fi
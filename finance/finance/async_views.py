@@ -0,0 +1,45 @@
+from asgiref.sync import sync_to_async
+from django.views import View
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(View):
+    """
+    Async Django view for ASGI deployments that answers like a DRF view.
+
+    ``api_view_class`` is the sync API view this view replaces. Its
+    authentication, permission and throttle classes are checked before
+    the handler runs, and errors, including APIExceptions raised by the
+    handler, are rendered by its exception handler (REST_FRAMEWORK
+    EXCEPTION_HANDLER). The checks query the database and the cache,
+    so they run in a thread. Handlers get the DRF request, with the
+    authenticated user, as ``self.drf_request``.
+    """
+
+    api_view_class: type[APIView] = APIView
+
+    async def dispatch(self, request, *args, **kwargs):
+        # The CSRF check of SessionAuthentication parses request.POST,
+        # after that request.body can no longer be read.
+        request.body
+        api_view = self.api_view = self.api_view_class()
+        api_view.setup(request, *args, **kwargs)
+        api_view.headers = api_view.default_response_headers
+        api_view.request = self.drf_request = api_view.initialize_request(
+            request, *args, **kwargs
+        )
+        try:
+            await sync_to_async(api_view.initial)(
+                self.drf_request, *args, **kwargs
+            )
+            return await super().dispatch(request, *args, **kwargs)
+        except Exception as exc:
+            return await sync_to_async(self.error_response)(exc)
+
+    def error_response(self, exc: Exception):
+        """Render an error the way api_view_class would."""
+        response = self.api_view.handle_exception(exc)
+        response = self.api_view.finalize_response(
+            self.drf_request, response, *self.args, **self.kwargs
+        )
+        return response.render()
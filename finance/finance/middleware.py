@@ -0,0 +1,126 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.utils.decorators import sync_and_async_middleware
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_SQL_LENGTH = 500
+
+
+class QueryMetrics:
+    """
+    Execute wrapper counting the SQL queries of a request and their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_duration = 0.0
+        self.slowest_sql = ""
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest_duration:
+                self.slowest_duration = elapsed
+                self.slowest_sql = sql
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, without the SQL text."""
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_duration * 1000:.2f}"
+        )
+
+    def log(self, request, response, duration: float) -> None:
+        """
+        Write one JSON log line for the request. Requests with more than
+        QUERY_METRICS_WARN_QUERIES queries are logged as warnings.
+        """
+        match = request.resolver_match
+        record = {
+            "event": "request_queries",
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else None,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 2),
+            "slowest_ms": round(self.slowest_duration * 1000, 2),
+            "slowest_sql": self.slowest_sql[:SLOWEST_SQL_LENGTH],
+        }
+        level = (
+            logging.WARNING
+            if self.count > settings.QUERY_METRICS_WARN_QUERIES
+            else logging.INFO
+        )
+        logger.log(level, json.dumps(record, ensure_ascii=False))
+
+
+def _finish(request, response, metrics: QueryMetrics, start: float):
+    metrics.log(request, response, time.perf_counter() - start)
+    if settings.QUERY_METRICS_SERVER_TIMING:
+        response["Server-Timing"] = metrics.server_timing()
+    return response
+
+
+@sync_and_async_middleware
+def query_metrics_middleware(get_response):
+    """
+    Record the number of SQL queries, total database time and the slowest
+    statement of a sampled share of requests (QUERY_METRICS_SAMPLE_RATE).
+
+    Metrics go to the Server-Timing header and a JSON log line. Queries run
+    while a streaming response is being sent are not counted.
+    """
+    sample_rate = settings.QUERY_METRICS_SAMPLE_RATE
+
+    def is_sampled() -> bool:
+        return sample_rate >= 1 or random.random() < sample_rate
+
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            if not is_sampled():
+                return await get_response(request)
+
+            metrics = QueryMetrics()
+            stack = ExitStack()
+            # Database calls of an async request run in the request's
+            # sync_to_async thread, so the wrapper is installed there.
+            await sync_to_async(
+                lambda: stack.enter_context(connection.execute_wrapper(metrics))
+            )()
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+            return _finish(request, response, metrics, start)
+
+    else:
+
+        def middleware(request):
+            if not is_sampled():
+                return get_response(request)
+
+            metrics = QueryMetrics()
+            start = time.perf_counter()
+            with connection.execute_wrapper(metrics):
+                response = get_response(request)
+            return _finish(request, response, metrics, start)
+
+    return middleware
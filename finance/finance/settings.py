@@ -10,7 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 import os
+import tempfile
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -63,6 +65,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'finance.middleware.query_metrics_middleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -175,6 +178,13 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'finance.wsgi.application'
+ASGI_APPLICATION = 'finance.asgi.application'
+
+# Режим запуска: wsgi (gunicorn sync workers) или asgi (uvicorn workers).
+# В режиме asgi прокси к timesheets и callback Яндекса работают
+# асинхронно и не занимают воркер на время ожидания внешнего сервиса.
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").lower()
+ASYNC_VIEWS = SERVER_MODE == "asgi"
 
 DATABASES = {
     "default": {
@@ -187,6 +197,86 @@ DATABASES = {
     },
 }
 
+# Соединения с PostgreSQL (DB_POOL_MODE):
+# persistent - воркер переиспользует соединение DB_CONN_MAX_AGE секунд,
+#   перед повторным использованием соединение проверяется (по умолчанию
+#   для wsgi);
+# pool - пул соединений psycopg 3 в каждом процессе (по умолчанию для
+#   asgi);
+# none - новое соединение на каждый запрос.
+# В режиме asgi запросы выполняются в разных потоках, и постоянные
+# соединения не закрываются, а накапливаются (Django ticket #33497),
+# поэтому persistent с asgi не используется.
+DB_POOL_MODE = os.getenv(
+    "DB_POOL_MODE", "pool" if ASYNC_VIEWS else "persistent"
+).lower()
+
+if DB_POOL_MODE == "persistent" and ASYNC_VIEWS:
+    raise ImproperlyConfigured(
+        "DB_POOL_MODE=persistent leaks connections with SERVER_MODE=asgi, "
+        "use pool or none."
+    )
+
+if DB_POOL_MODE == "persistent":
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.getenv("DB_CONN_MAX_AGE", 60)
+    )
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+elif DB_POOL_MODE == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+        },
+    }
+elif DB_POOL_MODE != "none":
+    raise ImproperlyConfigured(
+        f"Unknown DB_POOL_MODE {DB_POOL_MODE!r}, "
+        "expected persistent, pool or none."
+    )
+
+# Кеш. Аналитика хранится в отдельном кеше, по умолчанию файловом,
+# чтобы сброс версии кеша пользователя был виден всем воркерам gunicorn.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analytics": {
+        "BACKEND": os.getenv(
+            "ANALYTICS_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "ANALYTICS_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "finance_analytics_cache"),
+        ),
+        "TIMEOUT": int(os.getenv("ANALYTICS_CACHE_TIMEOUT", 60 * 60 * 24)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", 10000)),
+        },
+    },
+}
+
+# SQL-запросы аналитики выполняются как подготовленные выражения
+# (PREPARE/EXECUTE). Отключить, если используется pgbouncer
+# в режиме transaction pooling.
+ANALYTICS_PREPARED_STATEMENTS = os.getenv(
+    "ANALYTICS_PREPARED_STATEMENTS", "True"
+).lower() in ("true", "1")
+
+# Метрики SQL для каждого запроса к API (количество, время, самый медленный
+# запрос) в заголовке Server-Timing и в логе finance.middleware.
+# QUERY_METRICS_SAMPLE_RATE - доля запросов, для которых собираются
+# метрики (0 - отключено). Запросы, выполнившие больше
+# QUERY_METRICS_WARN_QUERIES запросов к базе, логируются как WARNING.
+QUERY_METRICS_SAMPLE_RATE = float(os.getenv("QUERY_METRICS_SAMPLE_RATE", 1))
+QUERY_METRICS_WARN_QUERIES = int(os.getenv("QUERY_METRICS_WARN_QUERIES", 50))
+QUERY_METRICS_SERVER_TIMING = os.getenv(
+    "QUERY_METRICS_SERVER_TIMING", "True"
+).lower() in ("true", "1")
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -325,6 +415,11 @@ LOGGING = {
             'level': 'WARN',
             'propagate': False,
         },
+        'httpx': {
+            'handlers': ['console'],
+            'level': 'WARN',
+            'propagate': False,
+        },
     },
 }
 
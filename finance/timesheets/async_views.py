@@ -0,0 +1,104 @@
+import httpx
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from finance.async_views import AsyncAPIView
+from . import client
+from .views import (
+    CHUNK_SIZE,
+    FORWARD_RESPONSE_HEADERS,
+    TimesheetsProxyView,
+    TimesheetsUpstreamMixin,
+    proxy_headers,
+    proxy_params,
+)
+
+
+async def stream_body(response: httpx.Response):
+    """
+    Yield the upstream body chunk by chunk and release the pooled
+    connection once the body is consumed or the client disconnects.
+    """
+    try:
+        async for chunk in response.aiter_bytes(CHUNK_SIZE):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+class AsyncTimesheetsProxyView(TimesheetsUpstreamMixin, AsyncAPIView):
+    """
+    Async counterpart of TimesheetsProxyView for ASGI deployments.
+
+    Waiting for the timesheets service does not hold a worker thread, so
+    one process can serve many slow upstream calls at once. Authentication,
+    permissions, throttling and error responses are those of
+    ``api_view_class``.
+    """
+
+    api_view_class = TimesheetsProxyView
+
+    async def proxy(self, request, path: str, default_params: dict):
+        async_client = client.get_async_client()
+        upstream_request = async_client.build_request(
+            request.method,
+            path,
+            params=proxy_params(
+                request, self.drf_request.user.id, default_params
+            ),
+            content=request.body or None,
+            headers=proxy_headers(request),
+        )
+        try:
+            upstream = await async_client.send(upstream_request, stream=True)
+        except httpx.TimeoutException:
+            raise client.UpstreamTimeout()
+        except httpx.HTTPError:
+            raise client.UpstreamUnavailable()
+
+        response = StreamingHttpResponse(
+            stream_body(upstream), status=upstream.status_code
+        )
+        for name in FORWARD_RESPONSE_HEADERS:
+            if name in upstream.headers:
+                response[name] = upstream.headers[name]
+        return response
+
+    async def get(self, request, *args, **kwargs):
+        return await self.proxy(
+            request, *self.upstream_for(request.method, **kwargs)
+        )
+
+    async def post(self, request, *args, **kwargs):
+        return await self.proxy(
+            request, *self.upstream_for(request.method, **kwargs)
+        )
+
+    async def put(self, request, *args, **kwargs):
+        return await self.proxy(
+            request, *self.upstream_for(request.method, **kwargs)
+        )
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.proxy(
+            request, *self.upstream_for(request.method, **kwargs)
+        )
+
+    async def delete(self, request, *args, **kwargs):
+        return await self.proxy(
+            request, *self.upstream_for(request.method, **kwargs)
+        )
+
+
+def as_async_view(view_class: type[TimesheetsProxyView]):
+    """
+    Build an async view proxying the same upstream as ``view_class``.
+    Like DRF views it is CSRF exempt, SessionAuthentication still
+    enforces CSRF for session-authenticated requests.
+    """
+    return csrf_exempt(AsyncTimesheetsProxyView.as_view(
+        api_view_class=view_class,
+        upstream_path=view_class.upstream_path,
+        method_upstreams=view_class.method_upstreams,
+        http_method_names=view_class.http_method_names,
+    ))
@@ -0,0 +1,108 @@
+import os
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from urllib3.util.retry import Retry
+
+HOST = os.getenv('FINANCE_FASTAPI_URL', 'http://fastapi:8080')
+
+BASE_URL = f"{HOST}/api/v1/"
+
+CONNECT_TIMEOUT = float(os.getenv('FASTAPI_CONNECT_TIMEOUT', 3))
+READ_TIMEOUT = float(os.getenv('FASTAPI_READ_TIMEOUT', 30))
+POOL_SIZE = int(os.getenv('FASTAPI_POOL_SIZE', 10))
+
+
+class UpstreamUnavailable(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = 'Timesheets service is unavailable.'
+    default_code = 'upstream_unavailable'
+
+
+class UpstreamTimeout(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = 'Timesheets service did not respond in time.'
+    default_code = 'upstream_timeout'
+
+
+def create_session() -> requests.Session:
+    """
+    Create a session with a keep-alive connection pool to the timesheets
+    service.
+
+    Failed connections are retried for every method, since the request
+    never reached the service. 502/503/504 responses are retried only for
+    idempotent methods. Read timeouts are not retried, so a slow service
+    fails after READ_TIMEOUT instead of a multiple of it.
+    """
+    retry = Retry(
+        total=3,
+        connect=3,
+        read=False,
+        status=2,
+        backoff_factor=0.2,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD', 'PUT', 'DELETE'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=POOL_SIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# One session per worker process, shared by all requests.
+session = create_session()
+
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the worker's async client for the timesheets service.
+
+    The client is created on first use, inside the running event loop of
+    the ASGI worker, and then reused for all requests of that worker.
+    Failed connections are retried, other errors are not.
+    """
+    global _async_client
+    if _async_client is None:
+        transport = httpx.AsyncHTTPTransport(
+            retries=3,
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE * 10,
+                max_keepalive_connections=POOL_SIZE,
+            ),
+        )
+        _async_client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            transport=transport,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+def request(method: str, path: str, **kwargs) -> requests.Response:
+    """
+    Send a request to the timesheets service.
+
+    :param method: HTTP method.
+    :param path: Path relative to BASE_URL.
+    :param kwargs: Extra arguments for requests, e.g. params or json.
+    :return: The service response.
+    """
+    kwargs.setdefault('timeout', (CONNECT_TIMEOUT, READ_TIMEOUT))
+    try:
+        return session.request(method, BASE_URL + path, **kwargs)
+    except requests.Timeout:
+        raise UpstreamTimeout()
+    except requests.RequestException:
+        raise UpstreamUnavailable()
@@ -0,0 +1,131 @@
+import json
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+
+from app_user.models import CustomUser
+from .async_views import as_async_view
+from .views import ManyAddShifts
+
+
+class TimesheetsProxySessionTest(TestCase):
+    """Прокси передает тело POST при аутентификации по сессии."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user("proxy@example.com")
+        self.client = APIClient(enforce_csrf_checks=True)
+        self.client.force_login(self.user)
+
+    @mock.patch("timesheets.views.client.request")
+    def test_post_body_is_forwarded(self, request):
+        request.return_value = mock.Mock(
+            status_code=201, headers={}, iter_content=lambda **kw: [b"{}"]
+        )
+        csrf_token = "a" * 32
+        self.client.cookies["csrftoken"] = csrf_token
+        response = self.client.post(
+            reverse("many_add"),
+            b'[{"date": "2024-05-15", "time": 8}]',
+            content_type="application/json",
+            HTTP_X_CSRFTOKEN=csrf_token,
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            request.call_args.kwargs["data"],
+            b'[{"date": "2024-05-15", "time": 8}]',
+        )
+
+    @mock.patch("timesheets.views.client.request")
+    def test_post_without_csrf_token_is_rejected(self, request):
+        response = self.client.post(
+            reverse("many_add"), b"[]", content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 403)
+        request.assert_not_called()
+
+
+class AsyncTimesheetsProxyTest(TestCase):
+    """Async прокси проверяет запросы так же, как синхронный."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("async@example.com")
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.sent = []
+        self.upstream = httpx.AsyncClient(
+            base_url="http://timesheets/api/v1/",
+            transport=httpx.MockTransport(self.answer),
+        )
+        patcher = mock.patch(
+            "timesheets.async_views.client.get_async_client",
+            return_value=self.upstream,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def answer(self, request: httpx.Request) -> httpx.Response:
+        self.sent.append(request)
+        return httpx.Response(201, json={"result": True})
+
+    async def post(self, **headers):
+        view = as_async_view(ManyAddShifts)
+        request = AsyncRequestFactory().post(
+            "/api/v1/timesheets/add-many-shifts/",
+            b"[]",
+            content_type="application/json",
+            headers=headers,
+        )
+        response = await view(request)
+        if isinstance(response, StreamingHttpResponse):
+            # Дочитываем поток, чтобы закрыть ответ сервиса.
+            [chunk async for chunk in response.streaming_content]
+        return response
+
+    async def test_forwards_body_with_user_id(self):
+        response = await self.post(authorization=f"Token {self.token.key}")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.sent[0].content, b"[]")
+        self.assertEqual(
+            self.sent[0].url.params["user_id"], str(self.user.pk)
+        )
+
+    async def test_not_authenticated(self):
+        response = await self.post()
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", json.loads(response.content))
+        self.assertEqual(self.sent, [])
+
+    @mock.patch.object(UserRateThrottle, "rate", "1/day", create=True)
+    async def test_throttled(self):
+        await self.post(authorization=f"Token {self.token.key}")
+        response = await self.post(authorization=f"Token {self.token.key}")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(len(self.sent), 1)
+
+    async def test_upstream_unavailable(self):
+        self.upstream._transport = httpx.MockTransport(self.refuse)
+        response = await self.post(authorization=f"Token {self.token.key}")
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(
+            json.loads(response.content),
+            {"detail": "Timesheets service is unavailable."},
+        )
+
+    def refuse(self, request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 
@@ -11,12 +12,18 @@ from .views import (
     VacationView
 )
 
+if settings.ASYNC_VIEWS:
+    from .async_views import as_async_view as as_view
+else:
+    def as_view(view_class):
+        return view_class.as_view()
+
 urlpatterns = [
-    path("settings/", GetTimesheetsSettings.as_view(), name="get_settings"),
-    path("shifts/", GetShifts.as_view(), name="shifts"),
-    path("shifts/vacation/", VacationView.as_view(), name="vacation"),
-    path("shifts/<str:day_id>/", GetShiftsForDay.as_view(), name="shifts_day_id"),
-    path("add-many-shifts/", ManyAddShifts.as_view(), name="many_add"),
-    path("statistics/year/", StatisticForYear.as_view(), name="stat_year"),
-    path("statistics/month/", StatisticForMonth.as_view(), name="stat_month")
+    path("settings/", as_view(GetTimesheetsSettings), name="get_settings"),
+    path("shifts/", as_view(GetShifts), name="shifts"),
+    path("shifts/vacation/", as_view(VacationView), name="vacation"),
+    path("shifts/<str:day_id>/", as_view(GetShiftsForDay), name="shifts_day_id"),
+    path("add-many-shifts/", as_view(ManyAddShifts), name="many_add"),
+    path("statistics/year/", as_view(StatisticForYear), name="stat_year"),
+    path("statistics/month/", as_view(StatisticForMonth), name="stat_month")
 ]
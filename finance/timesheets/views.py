@@ -1,6 +1,4 @@
-import os
-import requests
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics
@@ -11,6 +9,7 @@ from rest_framework.authentication import (
 )
 from rest_framework.permissions import IsAuthenticated
 
+from . import client
 from .schemas import (
     ManyAddSchemas,
     StatisticForMonthSchema,
@@ -20,65 +19,75 @@ from .schemas import (
     StatisticForYearSchema, VacationAddSchemas
 )
 
-HOST = os.getenv('FINANCE_FASTAPI_URL', 'http://fastapi:8080')
+# Request headers passed to the timesheets service.
+FORWARD_REQUEST_HEADERS = ("Content-Type", "Accept")
+# Response headers passed back to the client.
+FORWARD_RESPONSE_HEADERS = (
+    "Content-Type",
+    "Content-Disposition",
+    "Cache-Control",
+    "ETag",
+    "Last-Modified",
+)
+CHUNK_SIZE = 64 * 1024
 
-BASE_URL = f"{HOST}/api/v1/"
 
+def stream_body(response, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield the upstream body chunk by chunk and release the pooled
+    connection once the body is consumed or the client disconnects.
+    """
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
 
-@extend_schema(tags=["TimeSheetsSettings"])
-@TimeSheetsSettingsSchema
-class GetTimesheetsSettings(generics.GenericAPIView):
-    """A class for working with user settings."""
 
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
-    http_method_names = ["get", "post", "delete"]
+def proxy_params(request, user_id: int, default_params: dict) -> dict:
+    """Query params for the timesheets service with the user's id."""
+    params = dict(default_params)
+    params.update(request.GET.lists())
+    params["user_id"] = user_id
+    return params
 
-    def get(self, request, *args, **kwargs):
-        """Get monthly cost or income analytics."""
-        user = request.user.id
-        external_response = requests.get(url=(BASE_URL + f"settings/?user_id={user}"))
-
-        return HttpResponse(
-            external_response.content,
-            content_type='application/json',
-            status=external_response.status_code
-        )
 
-    def post(self, request):
-        user = request.user.id
-        data = request.data
-        response = requests.post(
-            url=f"{BASE_URL}settings/?user_id={user}",
-            json=data if isinstance(data, dict) else dict(data),
-            timeout=30
-        )
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
+def proxy_headers(request) -> dict:
+    return {
+        name: request.headers[name]
+        for name in FORWARD_REQUEST_HEADERS
+        if name in request.headers
+    }
 
-    def delete(self, request, *args, **kwargs):
-        user = request.user.id
-        response = requests.delete(
-            url=(BASE_URL + f"settings/?user_id={user}")
-        )
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
+
+class TimesheetsUpstreamMixin:
+    """Where a proxy view sends its requests."""
+
+    upstream_path = ""
+    # Per-method overrides: {"POST": (path, default query params)}.
+    method_upstreams: dict[str, tuple[str, dict]] = {}
+
+    def upstream_for(self, method: str, **kwargs) -> tuple[str, dict]:
+        """
+        Return the upstream path and default query params for a request.
+
+        :param method: HTTP method of the request.
+        :param kwargs: URL kwargs of the request.
+        """
+        path, default_params = self.method_upstreams.get(
+            method, (self.upstream_path, {})
         )
+        return path.format(**kwargs), default_params
 
 
-@extend_schema(tags=["Shifts"])
-@TimeSheetsSchema
-class GetShifts(generics.GenericAPIView):
-    """A class for working with user settings."""
+class TimesheetsProxyView(TimesheetsUpstreamMixin, generics.GenericAPIView):
+    """
+    Stream a request to the timesheets service and its response back.
+
+    The path is built from ``upstream_path`` and the URL kwargs, the query
+    string and body are forwarded as is and ``user_id`` is always set to
+    the authenticated user. A new endpoint only needs a URL entry, e.g.
+    ``TimesheetsProxyView.as_view(upstream_path="shifts/date/")``.
+    """
 
     permission_classes = [IsAuthenticated]
     authentication_classes = (
@@ -86,183 +95,111 @@ class GetShifts(generics.GenericAPIView):
         BasicAuthentication,
         SessionAuthentication,
     )
-    http_method_names = ["get", "post", "put"]
 
-    def get(self, request):
-        """Get monthly cost or income analytics."""
-        user = request.user.id
-        data = request.GET.dict()
-        url = f"{BASE_URL}shifts/?user_id={user}&year={data["year"]}&month={data["month"]}"
-        response = requests.get(url=url)
-
-        return HttpResponse(
-            response.content,
-            content_type='application/json',
-            status=response.status_code
-        )
+    def initial(self, request, *args, **kwargs):
+        """
+        Read the raw body before authentication: the CSRF check of
+        SessionAuthentication parses request.POST, and after that
+        request.body can no longer be read.
+        """
+        self.raw_body: bytes = request.body
+        super().initial(request, *args, **kwargs)
+
+    def proxy(
+        self, request, path: str, default_params: dict
+    ) -> StreamingHttpResponse:
+        """
+        Send the request to the timesheets service and stream the answer.
+
+        :param request: Incoming request.
+        :param path: Path relative to the timesheets API.
+        :param default_params: Query params used when the client
+                               does not pass them.
+        """
+        upstream = client.request(
+            request.method,
+            path,
+            params=proxy_params(request, request.user.id, default_params),
+            data=self.raw_body or None,
+            headers=proxy_headers(request),
+            stream=True,
+        )
+        response = StreamingHttpResponse(
+            stream_body(upstream), status=upstream.status_code
+        )
+        for name in FORWARD_RESPONSE_HEADERS:
+            if name in upstream.headers:
+                response[name] = upstream.headers[name]
+        return response
 
-    def post(self, request):
-        return self._handle_shifts_request(request)
+    def get(self, request, *args, **kwargs):
+        return self.proxy(request, *self.upstream_for(request.method, **kwargs))
 
-    def put(self, request):
-        return self._handle_shifts_request(request)
+    def post(self, request, *args, **kwargs):
+        return self.proxy(request, *self.upstream_for(request.method, **kwargs))
 
-    def _handle_shifts_request(self, request):
-        user = request.user.id
-        data = request.data
-        response = requests.post(
-            url=f"{BASE_URL}shifts/?user_id={user}",
-            json=data if isinstance(data, dict) else dict(data),
-            timeout=30
-        )
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
+    def put(self, request, *args, **kwargs):
+        return self.proxy(request, *self.upstream_for(request.method, **kwargs))
 
+    def patch(self, request, *args, **kwargs):
+        return self.proxy(request, *self.upstream_for(request.method, **kwargs))
 
-@extend_schema(tags=["ShiftsForDay"])
-@TimeSheetsForDaySchema
-class GetShiftsForDay(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
+    def delete(self, request, *args, **kwargs):
+        return self.proxy(request, *self.upstream_for(request.method, **kwargs))
+
+
+@extend_schema(tags=["TimeSheetsSettings"])
+@TimeSheetsSettingsSchema
+class GetTimesheetsSettings(TimesheetsProxyView):
+    """A class for working with user settings."""
+
+    upstream_path = "settings/"
     http_method_names = ["get", "post", "delete"]
 
-    def get(self, request,  day_id: str):
-        print(f"{BASE_URL}shifts/{day_id}/")
-        response = requests.get(url=f"{BASE_URL}shifts/{day_id}/")
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
 
-    def post(self, request, day_id):
-        data = request.GET.dict()
-        user_id = request.user.id
-        url = f"{BASE_URL}shifts/{day_id}/award/?user_id={user_id}"\
-              f"&count_operations={data.get('count_operations', 0)}"
-        response = requests.post(url=url)
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
+@extend_schema(tags=["Shifts"])
+@TimeSheetsSchema
+class GetShifts(TimesheetsProxyView):
+    """A class for working with shifts for a month."""
 
-    def delete(self, request, day_id):
-        response = requests.delete(url=f"{BASE_URL}shifts/{day_id}/")
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
+    upstream_path = "shifts/"
+    http_method_names = ["get", "post", "put"]
+
+
+@extend_schema(tags=["ShiftsForDay"])
+@TimeSheetsForDaySchema
+class GetShiftsForDay(TimesheetsProxyView):
+    upstream_path = "shifts/{day_id}/"
+    http_method_names = ["get", "post", "delete"]
+    # POST adds an award for the day.
+    method_upstreams = {
+        "POST": ("shifts/{day_id}/award/", {"count_operations": 0}),
+    }
 
 
 @extend_schema(tags=["ShiftsManyAdd"])
 @ManyAddSchemas
-class ManyAddShifts(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
+class ManyAddShifts(TimesheetsProxyView):
+    upstream_path = "shifts/many/"
     http_method_names = ["post"]
 
-    def post(self, request):
-        data, user_id = request.data, request.user.id
-        response = requests.post(
-            url=f"{BASE_URL}shifts/many/?user_id={user_id}",
-            json=data if isinstance(data, dict) else dict(data),
-            timeout=30
-        )
-
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
-
 
 @extend_schema(tags=["Statistic"])
 @StatisticForMonthSchema
-class StatisticForMonth(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
+class StatisticForMonth(TimesheetsProxyView):
+    upstream_path = "statistic/month/"
     http_method_names = ["get"]
 
-    def get(self, request):
-        data = request.GET.dict()
-        user_id, year, month = request.user.id, data["year"], data["month"]
-        response = requests.get(
-            url=f"{BASE_URL}statistic/month/?user_id={user_id}&year={year}&month={month}"
-        )
-
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
-
 
 @extend_schema(tags=["Statistic"])
 @StatisticForYearSchema
-class StatisticForYear(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
+class StatisticForYear(TimesheetsProxyView):
+    upstream_path = "statistic/year/"
     http_method_names = ["get"]
 
-    def get(self, request):
-        data = request.GET.dict()
-        user_id, year = request.user.id, data["year"]
-        response = requests.get(
-            url=f"{BASE_URL}statistic/year/?user_id={user_id}&year={year}"
-        )
-
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
-
 
 @extend_schema(tags=["Vacation"])
 @VacationAddSchemas
-class VacationView(generics.GenericAPIView):
-    permission_classes = [IsAuthenticated]
-    authentication_classes = (
-        TokenAuthentication,
-        BasicAuthentication,
-        SessionAuthentication,
-    )
+class VacationView(TimesheetsProxyView):
+    upstream_path = "shifts/vacation/"
     http_method_names = ["post"]
-
-    def post(self, request):
-        data, user_id = request.data, request.user.id
-        response = requests.post(
-            url=f"{BASE_URL}shifts/vacation/?user_id={user_id}",
-            json={
-                "start_date": data.get("start_date"),
-                "number_of_days": data.get("number_of_days"),
-                "type_days": data.get("type_days")
-            },
-            timeout=30
-        )
-        return HttpResponse(
-            response.content,
-            status=response.status_code,
-            content_type='application/json',
-        )
@@ -1,6 +1,14 @@
 from django.contrib import admin
+from django.db import transaction as db_transaction
 
-from .models import Transaction, Category
+from analytics.cache import invalidate_user_analytics
+from .models import Transaction, Category, CategoryMonthlyTotal
+from .util import (
+    merge_rollup_deltas,
+    queryset_rollup_deltas,
+    rollup_deltas,
+    update_category_rollup,
+)
 
 
 @admin.register(Transaction)
@@ -15,7 +23,54 @@ class TransactionAdmin(admin.ModelAdmin):
     list_filter: tuple = "user__email",
     list_display_links: tuple = "category__name",
 
+    @db_transaction.atomic
+    def save_model(self, request, obj: Transaction, form, change) -> None:
+        """
+        Сохраняет транзакцию и переносит ее сумму в таблице сумм
+        по категориям: старые значения вычитаются, новые добавляются.
+        """
+        deltas = []
+        if change:
+            old = Transaction.objects.select_related("category").get(
+                pk=obj.pk
+            )
+            deltas.append(rollup_deltas([old], sign=-1))
+            invalidate_user_analytics(old.user_id)
+        super().save_model(request, obj, form, change)
+        deltas.append(rollup_deltas([obj]))
+        update_category_rollup(merge_rollup_deltas(*deltas))
+        invalidate_user_analytics(obj.user_id)
+
+    @db_transaction.atomic
+    def delete_model(self, request, obj: Transaction) -> None:
+        """Удаляет транзакцию и вычитает ее из сумм по категориям."""
+        update_category_rollup(rollup_deltas([obj], sign=-1))
+        invalidate_user_analytics(obj.user_id)
+        super().delete_model(request, obj)
+
+    @db_transaction.atomic
+    def delete_queryset(self, request, queryset) -> None:
+        """Массовое удаление из списка транзакций."""
+        update_category_rollup(queryset_rollup_deltas(queryset, sign=-1))
+        for user_id in set(queryset.values_list("user_id", flat=True)):
+            invalidate_user_analytics(user_id)
+        super().delete_queryset(request, queryset)
+
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display: tuple = "name", "type_transaction", "user__email"
+
+
+@admin.register(CategoryMonthlyTotal)
+class CategoryMonthlyTotalAdmin(admin.ModelAdmin):
+    list_display: tuple = (
+        "category__name",
+        "year",
+        "month",
+        "type_transaction",
+        "total",
+        "count",
+        "user__email",
+    )
+    list_filter: tuple = "user__email",
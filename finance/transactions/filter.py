@@ -1,10 +1,10 @@
-from typing import Any, Optional, Dict, List
+from typing import Any, Dict, List
 from collections import defaultdict
 
 import django_filters
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Sum, Count
 
-from .models import Transaction, Category
+from .models import Transaction, CategoryMonthlyTotal
 from app_user.models import CustomUser
 
 
@@ -40,36 +40,60 @@ def get_category_statistics(
     """
     Главная функция: получает статистику по категориям в виде дерева.
     Суммы родительских категорий включают все дочерние транзакции.
+
+    Суммы читаются из предагрегированной таблицы. Если за месяц в ней
+    нет строк (например, транзакции добавлены в обход API), суммы
+    считаются по транзакциям через GROUP BY на стороне базы данных.
     """
-    # Шаг 1: Получаем сырые данные транзакций
-    transactions_data = fetch_transactions_with_categories(
-        user, year, month, type_tr
-    )
+    # Шаг 1: Получаем суммы по категориям за месяц
+    category_totals = list(fetch_category_rollup(user, year, month, type_tr))
+    if not category_totals:
+        category_totals = fetch_category_totals(user, year, month, type_tr)
     
-    # Шаг 2: Агрегируем суммы по категориям (только прямые транзакции)
-    categories_aggregated = aggregate_category_totals(transactions_data)
+    # Шаг 2: Собираем категории (только прямые транзакции)
+    categories_aggregated = aggregate_category_totals(category_totals)
     
-    # Шаг 3: Добавляем структуру children (пока без пересчета сумм)
-    categories_with_structure = link_children_to_parents(categories_aggregated)
-    
-    # Шаг 4: ПЕРЕСЧИТЫВАЕМ суммы с учетом иерархии (сумма = своя + всех детей)
-    categories_with_totals = calculate_hierarchical_totals(
-        categories_with_structure
+    # Шаг 3: Строим дерево, суммы родителей включают суммы всех детей
+    return build_category_tree(categories_aggregated)
+
+
+def fetch_category_rollup(
+    user: CustomUser, 
+    year: int, 
+    month: int, 
+    type_tr: str
+) -> QuerySet:
+    """
+    Получает суммы транзакций пользователя по категориям за указанный
+    месяц из таблицы предагрегированных сумм вместе с родителями.
+    """
+    return (CategoryMonthlyTotal.objects
+        .filter(
+            user=user,
+            year=year,
+            month=month,
+            type_transaction=type_tr
+        )
+        .values(
+            'category_id',
+            'category__name',
+            'category__parent_id',
+            'category__parent__name',
+            'total'
+        )
     )
-    
-    # Шаг 5: Строим иерархическое дерево с правильными суммами
-    return build_tree_from_roots(categories_with_totals)
 
 
-def fetch_transactions_with_categories(
+def fetch_category_totals(
     user: CustomUser, 
     year: int, 
     month: int, 
     type_tr: str
 ) -> QuerySet:
     """
-    Получает все транзакции пользователя за указанный 
-    месяц с информацией о категориях.
+    Считает суммы транзакций пользователя по категориям за указанный
+    месяц одним запросом: SUM и COUNT с группировкой по категории
+    и родителем, присоединенным в том же запросе.
     """
     return (Transaction.objects
         .filter(
@@ -78,184 +102,116 @@ def fetch_transactions_with_categories(
             create_at__month=month,
             category__type_transaction=type_tr
         )
-        .select_related('category')
         .values(
             'category_id',
             'category__name',
             'category__parent_id',
             'category__parent__name',
-            'amount'
         )
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
     )
 
 
 def aggregate_category_totals(
-    transactions: QuerySet
+    category_totals: QuerySet
 ) -> Dict[int, Dict[str, Any]]:
     """
-    Агрегирует суммы транзакций по категориям (только прямые транзакции).
-    Возвращает словарь {category_id: category_data}
+    Собирает категории из уже посчитанных сумм (только прямые транзакции).
+    Родительские категории без своих транзакций добавляются с нулевой
+    суммой. Возвращает словарь {category_id: category_data}
     """
     categories = {}
-    all_category_ids = set()  # Для отслеживания всех упомянутых категорий
-    parent_ids = set()  # Для отслеживания родительских ID
+    parents = {}
     
-    # Сначала собираем все ID категорий и родителей из транзакций
-    for transaction in transactions:
-        cat_id = transaction['category_id']
-        all_category_ids.add(cat_id)
+    for row in category_totals:
+        category = create_category_base_data(row)
+        category['total_direct'] = float(row['total'] or 0)
+        categories[row['category_id']] = category
         
-        parent_id = transaction['category__parent_id']
+        parent_id = row['category__parent_id']
         if parent_id:
-            parent_ids.add(parent_id)
+            parents[parent_id] = row['category__parent__name']
     
     # Добавляем родительские категории, даже если у них нет своих транзакций
-    all_category_ids.update(parent_ids)
-    
-    # Получаем информацию о категориях из базы
-    categories_from_db = Category.objects.filter(
-        id__in=all_category_ids
-    ).select_related('parent')
-    category_db_info = {}
-    
-    for cat in categories_from_db:
-        category_db_info[cat.id] = {
-            'name': cat.name,
-            'parent_id': cat.parent_id if cat.parent else None,
-            'parent_name': cat.parent.name if cat.parent else None,
-        }
-    
-    # Инициализируем все категории
-    for cat_id in all_category_ids:
-        if cat_id in category_db_info:
-            info = category_db_info[cat_id]
-            categories[cat_id] = {
-                'id': cat_id,
-                'name': info['name'],
-                'parent_id': info['parent_id'],
-                'parent_name': info['parent_name'],
-                'total_direct': 0,
-                'total_with_children': 0,
-                'children': []
-            }
-        else:
-            # Если категория не найдена в БД, создаем заглушку
-            categories[cat_id] = {
-                'id': cat_id,
-                'name': f"Category {cat_id}",
+    for parent_id, parent_name in parents.items():
+        if parent_id not in categories:
+            categories[parent_id] = {
+                'id': parent_id,
+                'name': parent_name,
                 'parent_id': None,
                 'parent_name': None,
                 'total_direct': 0,
                 'total_with_children': 0,
-                'children': []
             }
-    
-    # Теперь добавляем суммы из транзакций
-    for transaction in transactions:
-        cat_id = transaction['category_id']
-        if cat_id in categories:
-            categories[cat_id]['total_direct'] += float(
-                transaction['amount'] or 0
-            )
     return categories
 
 
-def create_category_base_data(transaction: Dict) -> Dict[str, Any]:
+def create_category_base_data(row: Dict) -> Dict[str, Any]:
     """
-    Создает базовую структуру данных для категории на основе одной транзакции.
+    Создает базовую структуру данных для категории на основе одной строки
+    с суммой по категории.
     """
     return {
-        'id': transaction['category_id'],
-        'name': transaction['category__name'],
-        'parent_id': transaction['category__parent_id'],
-        'parent_name': transaction['category__parent__name'],
+        'id': row['category_id'],
+        'name': row['category__name'],
+        'parent_id': row['category__parent_id'],
+        'parent_name': row['category__parent__name'],
         'total_direct': 0,  # Сумма только прямых транзакций этой категории
         'total_with_children': 0,  # Сумма с учетом всех детей (будет вычислена позже)
-        'children': []
     }
 
 
-def link_children_to_parents(
+def build_category_tree(
     categories: Dict[int, Dict[str, Any]]
-) -> Dict[int, Dict[str, Any]]:
+) -> List[Dict[str, Any]]:
     """
-    Связывает дочерние категории с их родителями.
-    Возвращает тот же словарь, но с заполненными полями children.
+    Строит дерево категорий за линейное время.
+    Дети индексируются по parent_id один раз, суммы с учетом детей
+    считаются снизу вверх без рекурсии:
+    total_with_children = total_direct + сумма total_with_children детей.
+    Узлы одного уровня сортируются по убыванию суммы, затем по имени и id.
+    Категория, чей родитель отсутствует в словаре, считается корневой.
     """
-    # Группируем категории по parent_id
     children_by_parent = defaultdict(list)
-    
     for cat_id, cat_data in categories.items():
         parent_id = cat_data['parent_id']
-        if parent_id:
-            children_by_parent[parent_id].append(cat_data)
-    
-    # Добавляем детей к родителям (без сортировки пока)
-    for parent_id, children in children_by_parent.items():
-        if parent_id in categories:
-            categories[parent_id]['children'] = children
-    
-    return categories
-
-
-def calculate_hierarchical_totals(
-    categories: Dict[int, Dict[str, Any]]
-) -> Dict[int, Dict[str, Any]]:
-    """
-    Рекурсивно вычисляет суммы для каждой категории с учетом всех дочерних.
-    total_with_children = total_direct + сумма всех total_with_children детей
-    """
-    # Множество для отслеживания обработанных категорий
-    processed: Set[int] = set()
-    
-    def calculate_node_total(cat_id: int) -> float:
-        """Рекурсивно вычисляет сумму для узла и его детей."""
-        if cat_id in processed:
-            return categories[cat_id]['total_with_children']
-        
+        if parent_id not in categories:
+            parent_id = None
+        children_by_parent[parent_id].append(cat_id)
+
+    roots = children_by_parent.pop(None, [])
+    nodes: Dict[int, Dict[str, Any]] = {}
+    # Обход в обратном порядке: узел обрабатывается после всех своих детей
+    stack = [(cat_id, False) for cat_id in roots]
+    while stack:
+        cat_id, children_ready = stack.pop()
+        child_ids = children_by_parent.get(cat_id, [])
+        if not children_ready:
+            stack.append((cat_id, True))
+            stack.extend((child_id, False) for child_id in child_ids)
+            continue
+
+        children = sort_category_nodes([nodes[child] for child in child_ids])
         cat_data = categories[cat_id]
-        total = cat_data['total_direct']
-        
-        # Добавляем суммы всех детей
-        for child in cat_data['children']:
-            total += calculate_node_total(child['id'])
-        
-        cat_data['total_with_children'] = total
-        processed.add(cat_id)
-        return total
-    
-    # Запускаем вычисление для всех корневых категорий
-    for cat_id, cat_data in categories.items():
-        if cat_id not in processed:
-            calculate_node_total(cat_id)
-    
-    return categories
+        cat_data['total_with_children'] = cat_data['total_direct'] + sum(
+            child['total'] for child in children
+        )
+        nodes[cat_id] = create_clean_category(cat_data, children)
 
+    return sort_category_nodes([nodes[cat_id] for cat_id in roots])
 
-def build_tree_from_roots(
-    categories: Dict[int, Dict[str, Any]]
+
+def sort_category_nodes(
+    nodes: List[Dict[str, Any]]
 ) -> List[Dict[str, Any]]:
     """
-    Рекурсивно строит дерево, используя вычисленные суммы с детьми.
+    Сортирует узлы дерева по убыванию суммы (с учетом детей).
+    При равных суммах порядок определяется именем и id.
     """
-    def build_subtree(parent_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Внутренняя рекурсивная функция для построения поддерева."""
-        subtree = []
-        
-        for cat_data in categories.values():
-            if cat_data['parent_id'] == parent_id:
-                # Рекурсивно получаем детей для этой категории
-                children = build_subtree(cat_data['id'])
-                
-                # Создаем чистую структуру категории для вывода
-                clean_category = create_clean_category(cat_data, children)
-                subtree.append(clean_category)
-        
-        # Сортируем поддерево по убыванию суммы (с учетом детей)
-        subtree.sort(key=lambda x: x['total'], reverse=True)
-        return subtree
-    
-    return build_subtree()
+    return sorted(
+        nodes, key=lambda node: (-node['total'], node['name'], node['id'])
+    )
 
 
 def create_clean_category(
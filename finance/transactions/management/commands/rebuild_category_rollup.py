@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_user.models import CustomUser
+from transactions.util import rebuild_category_rollup
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает суммы транзакций по категориям за каждый месяц."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            help="ID пользователя, для которого нужно пересчитать суммы.",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"] is not None:
+            try:
+                user = CustomUser.objects.get(pk=options["user"])
+            except CustomUser.DoesNotExist:
+                raise CommandError(
+                    f"Пользователь {options['user']} не найден."
+                )
+
+        created: int = rebuild_category_rollup(user)
+        self.stdout.write(
+            self.style.SUCCESS(f"Создано строк с суммами: {created}")
+        )
@@ -0,0 +1,124 @@
+# Generated by Django 5.1.5 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def fill_category_monthly_totals(apps, schema_editor):
+    """Заполняет суммы по категориям из существующих транзакций."""
+    Transaction = apps.get_model("transactions", "Transaction")
+    CategoryMonthlyTotal = apps.get_model("transactions", "CategoryMonthlyTotal")
+    rows = (
+        Transaction.objects.annotate(
+            year=ExtractYear("create_at"), month=ExtractMonth("create_at")
+        )
+        .values("user_id", "category_id", "year", "month", "category__type_transaction")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    CategoryMonthlyTotal.objects.bulk_create(
+        (
+            CategoryMonthlyTotal(
+                user_id=row["user_id"],
+                category_id=row["category_id"],
+                year=row["year"],
+                month=row["month"],
+                type_transaction=row["category__type_transaction"],
+                total=row["total"],
+                count=row["count"],
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0007_remove_category_transaction_level_50b283_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryMonthlyTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField(verbose_name="Год")),
+                ("month", models.PositiveSmallIntegerField(verbose_name="Месяц")),
+                (
+                    "type_transaction",
+                    models.CharField(max_length=20, verbose_name="Тип операции"),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=14,
+                        verbose_name="Сумма транзакций",
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Количество транзакций"
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_totals",
+                        to="transactions.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="category_totals",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "сумма по категории за месяц",
+                "verbose_name_plural": "суммы по категориям за месяц",
+                "db_table": "transactions_category_monthly_total",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "year", "month", "type_transaction"],
+                        name="transaction_user_id_66da89_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "user",
+                            "category",
+                            "year",
+                            "month",
+                            "type_transaction",
+                        ),
+                        name="unique_category_monthly_total",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_category_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.5 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0007_remove_transfer_destination_account_and_more"),
+        ("transactions", "0008_categorymonthlytotal"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "-create_at", "-id"],
+                name="transaction_user_id_dd1eab_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from decimal import Decimal
 
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models.functions import Upper
 from rest_framework import serializers
 
 from app_user.models import CustomUser
@@ -85,12 +87,19 @@ class Category(models.Model):
 
     @property
     def has_children(self):
-        """Проверяет, есть ли дочерние категории."""
+        """
+        Проверяет, есть ли дочерние категории.
+        Если дети уже загружены через prefetch_related, запрос не выполняется.
+        """
+        prefetched = getattr(self, "_prefetched_objects_cache", {})
+        if "children" in prefetched:
+            return bool(prefetched["children"])
         return self.children.exists()
 
     def get_children_direct(self):
         """
-        Получает прямых потомков (один запрос к БД).
+        Получает прямых потомков (один запрос к БД,
+        либо ни одного, если дети загружены через prefetch_related).
         """
         return self.children.all()
 
@@ -105,6 +114,12 @@ class Category(models.Model):
             models.Index(fields=['user', 'parent']),
             models.Index(fields=['user', 'level']),
             models.Index(fields=['user', 'parent', 'level']),
+            # Для фильтра category__name__icontains: Django сравнивает
+            # UPPER(name) LIKE UPPER(%s), поэтому индекс по UPPER(name).
+            GinIndex(
+                OpClass(Upper('name'), name='gin_trgm_ops'),
+                name='category_name_trgm_idx',
+            ),
         ]
         verbose_name = "категория транзакции"
         verbose_name_plural = "категории транзакций"
@@ -160,4 +175,65 @@ class Transaction(models.Model):
         verbose_name = "транзакция"
         verbose_name_plural = "транзакции"
         ordering = ["-create_at", "-amount", "category__name"]
+        indexes = [
+            models.Index(fields=["user", "-create_at", "-id"]),
+            models.Index(fields=["user", "category", "create_at"]),
+        ]
         db_table = "transactions"
+
+
+class CategoryMonthlyTotal(models.Model):
+    """
+    Предагрегированные суммы транзакций по категории за месяц.
+    Поддерживается при каждом изменении транзакций и используется
+    для статистики вместо сканирования всех транзакций месяца.
+    """
+
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name="category_totals",
+        verbose_name="Пользователь",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="monthly_totals",
+        verbose_name="Категория",
+    )
+    year = models.PositiveSmallIntegerField(verbose_name="Год")
+    month = models.PositiveSmallIntegerField(verbose_name="Месяц")
+    type_transaction = models.CharField(
+        max_length=20,
+        verbose_name="Тип операции"
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Сумма транзакций",
+    )
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество транзакций"
+    )
+
+    def __str__(self):
+        return (f"{self.category_id} {self.year}-{self.month:02d} "
+                f"{self.total}")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=[
+                    'user', 'category', 'year', 'month', 'type_transaction'
+                ],
+                name='unique_category_monthly_total'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['user', 'year', 'month', 'type_transaction']),
+        ]
+        verbose_name = "сумма по категории за месяц"
+        verbose_name_plural = "суммы по категориям за месяц"
+        db_table = "transactions_category_monthly_total"
@@ -0,0 +1,57 @@
+import codecs
+import csv
+import json
+from typing import Iterable, Iterator
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def decode_lines(stream: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """
+    Построчно декодирует поток байт, не загружая тело запроса целиком.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for line in stream:
+        yield decoder.decode(line)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class CSVParser(BaseParser):
+    """
+    Разбирает CSV с заголовком в ленивый поток словарей.
+    """
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return csv.DictReader(decode_lines(stream, "utf-8-sig"))
+
+
+class JSONLinesParser(BaseParser):
+    """
+    Разбирает JSON lines (один JSON-объект на строку)
+    в ленивый поток словарей.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        return self._iter_rows(decode_lines(stream, "utf-8-sig"))
+
+    @staticmethod
+    def _iter_rows(lines: Iterable[str]) -> Iterator[dict]:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                raise ParseError(f"Строка {number}: некорректный JSON - {exc}")
+            if not isinstance(row, dict):
+                raise ParseError(f"Строка {number}: ожидается JSON-объект.")
+            yield row
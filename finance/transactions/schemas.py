@@ -1,3 +1,4 @@
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     OpenApiParameter,
     extend_schema,
@@ -13,7 +14,9 @@ from .serializers import (
     CategorySerializer,
     CategoryCreateSerializer,
     CategoryTransactionStatisticsSerializer,
+    TransactionImportResultSerializer,
     TransactionSerializer,
+    TransactionListSerializer,
     TransactionSerializerGet,
     TransactionSerializersAdd,
     TransactionSerializersPatch,
@@ -28,10 +31,22 @@ TtransactionViewSchema = extend_schema_view(
                 "type", str,
                 description="Тип транзакции(income, expence)",
                 required=True
+            ),
+            OpenApiParameter(
+                "pagination", str,
+                description="cursor - постраничный вывод по курсору "
+                            "вместо номера страницы",
+                required=False
+            ),
+            OpenApiParameter(
+                "cursor", str,
+                description="Курсор из ссылок next/previous "
+                            "(при pagination=cursor)",
+                required=False
             )],
         description="Получить список транзакций у конкретного пользователя.",
         responses={
-            200: TransactionSerializer,
+            200: TransactionListSerializer,
             401: IsNotAuthentication,
         },
     ),
@@ -55,6 +70,58 @@ TtransactionViewSchema = extend_schema_view(
 )
 
 
+transaction_import_schema = extend_schema_view(
+    post=extend_schema(
+        operation_id="import_transactions",
+        parameters=[
+            OpenApiParameter(
+                "type", str,
+                description="Тип транзакций(income, expense)",
+                required=True
+            ),
+        ],
+        description="Массовый импорт транзакций из CSV (text/csv) или "
+                    "JSON lines (application/x-ndjson). Поля строки: "
+                    "amount, create_at, category, account, comment. "
+                    "Категория и счет указываются id или названием, "
+                    "значение, совпадающее с id одного объекта и "
+                    "названием другого, считается ошибкой. "
+                    "При ошибке в любой строке импорт отменяется целиком.",
+        request={
+            "text/csv": {"type": "string"},
+            "application/x-ndjson": {"type": "string"},
+        },
+        responses={
+            201: TransactionImportResultSerializer,
+            400: ValidationError,
+            401: IsNotAuthentication,
+        },
+    ),
+)
+
+
+transaction_export_schema = extend_schema_view(
+    get=extend_schema(
+        operation_id="export_transactions",
+        parameters=[
+            OpenApiParameter(
+                "type", str,
+                description="Тип транзакций(income, expense), "
+                            "без параметра выгружаются все",
+                required=False
+            ),
+        ],
+        description="Выгрузка транзакций пользователя в CSV. Поддерживает "
+                    "те же фильтры, что и список транзакций. Файл "
+                    "отдается потоком.",
+        responses={
+            (200, "text/csv"): OpenApiTypes.STR,
+            401: IsNotAuthentication,
+        },
+    ),
+)
+
+
 RetrieveUpdateDeleteTransactionSchema = extend_schema_view(
     get=extend_schema(
         operation_id="get_transaction_by_id",
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from django.db import models
 
@@ -61,6 +63,65 @@ class TransactionSerializer(serializers.ModelSerializer):
         ]
 
 
+# Поле используется только для форматирования даты в списке транзакций.
+_datetime_field = serializers.DateTimeField()
+
+
+class TransactionCategoryListSerializer(serializers.Serializer):
+    """
+    Описывает категорию в списке транзакций.
+    """
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    type_transaction = serializers.CharField(read_only=True)
+    parent = ParentSerializers(read_only=True, allow_null=True)
+
+
+class TransactionListSerializer(serializers.Serializer):
+    """
+    Плоский сериализатор только для чтения списка транзакций.
+    Поля описывают схему ответа, а to_representation собирает словарь
+    напрямую из объекта, без обхода полей DRF. Ожидает queryset
+    с select_related("category__parent", "account").
+    """
+    id = serializers.IntegerField(read_only=True)
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    create_at = serializers.DateTimeField(read_only=True)
+    category = TransactionCategoryListSerializer(read_only=True)
+    account = AccountSerializer(read_only=True)
+    comment = serializers.CharField(read_only=True, allow_null=True)
+
+    def to_representation(self, instance: Transaction) -> dict:
+        category: Category = instance.category
+        parent: Category | None = category.parent
+        account = instance.account
+        return {
+            "id": instance.id,
+            "amount": f"{instance.amount:f}",
+            "create_at": _datetime_field.to_representation(
+                instance.create_at
+            ),
+            "category": {
+                "id": category.id,
+                "name": category.name,
+                "type_transaction": category.type_transaction,
+                "parent": (
+                    {"id": parent.id, "name": parent.name}
+                    if parent is not None else None
+                ),
+            },
+            "account": {
+                "id": account.id,
+                "name": account.name,
+                "balance": f"{account.balance:f}",
+                "is_active": account.is_active,
+            },
+            "comment": instance.comment,
+        }
+
+
 class TransactionSerializersAdd(serializers.ModelSerializer):
     """
     Нужен для сериализации входных данных для добавления дохода.
@@ -93,6 +154,29 @@ class TransactionSerializerGet(serializers.ModelSerializer):
         ]
 
 
+class TransactionImportSerializer(serializers.Serializer):
+    """
+    Нужен для валидации строки при массовом импорте транзакций.
+    Категория и счет передаются id или названием.
+    """
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.01")
+    )
+    create_at = serializers.DateTimeField()
+    category = serializers.CharField(max_length=100)
+    account = serializers.CharField(max_length=50)
+    comment = serializers.CharField(
+        max_length=200, required=False, allow_blank=True, default=""
+    )
+
+
+class TransactionImportResultSerializer(serializers.Serializer):
+    """
+    Результат массового импорта транзакций.
+    """
+    created = serializers.IntegerField()
+
+
 class TransactionSerializersPatch(serializers.ModelSerializer):
 
     class Meta:
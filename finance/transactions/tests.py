@@ -1,3 +1,510 @@
-from django.test import TestCase
+from datetime import datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import Account
+from app_user.models import CustomUser
+from .admin import TransactionAdmin
+from .filter import TransactionFilter, get_category_statistics
+from .models import Category, CategoryMonthlyTotal, Transaction
+from .util import ImportAborted, import_transactions, rebuild_category_rollup
+
+MOSCOW = ZoneInfo("Europe/Moscow")
+
+
+class CategoryStatisticsTest(TestCase):
+    """Статистика по категориям из таблицы сумм и по транзакциям."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("stats@example.com")
+        account = Account.objects.create(name="Карта", user=cls.user)
+        food = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        cafe = Category.objects.create(
+            name="Кафе", user=cls.user, type_transaction="expense",
+            parent=food, level=1,
+        )
+        for category, amount in ((food, "10.50"), (cafe, "20"), (cafe, "5")):
+            Transaction.objects.create(
+                user=cls.user,
+                category=category,
+                account=account,
+                amount=Decimal(amount),
+                create_at=datetime(2024, 5, 15, 12, tzinfo=MOSCOW),
+            )
+        rebuild_category_rollup(cls.user)
+
+    def get_statistics(self):
+        return get_category_statistics(self.user, 2024, 5, "expense")
+
+    def test_parent_total_includes_children(self):
+        with self.assertNumQueries(1):
+            statistics = self.get_statistics()
+
+        self.assertEqual(len(statistics), 1)
+        self.assertEqual(statistics[0]["name"], "Еда")
+        self.assertEqual(statistics[0]["total_direct"], 10.5)
+        self.assertEqual(statistics[0]["total"], 35.5)
+        self.assertEqual(statistics[0]["children"][0]["total"], 25)
+
+    def test_falls_back_to_transactions_without_rollup(self):
+        expected = self.get_statistics()
+        CategoryMonthlyTotal.objects.filter(user=self.user).delete()
+
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get_statistics(), expected)
+
+    def test_empty_month(self):
+        self.assertEqual(
+            get_category_statistics(self.user, 2024, 6, "expense"), []
+        )
+
+
+class CategoryRollupMaintenanceTest(TestCase):
+    """
+    Изменения транзакций через API и админку поддерживают таблицу сумм
+    по категориям такой же, как после полного пересчета.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("rollup@example.com")
+        cls.card = Account.objects.create(name="Карта", user=cls.user)
+        cls.cash = Account.objects.create(name="Наличные", user=cls.user)
+        cls.food = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        cls.cafe = Category.objects.create(
+            name="Кафе", user=cls.user, type_transaction="expense",
+            parent=cls.food, level=1,
+        )
+        # Транзакция на другом счете остается после удаления карты.
+        Transaction.objects.create(
+            user=cls.user,
+            category=cls.food,
+            account=cls.cash,
+            amount=Decimal("7"),
+            create_at=datetime(2024, 5, 10, 12, tzinfo=MOSCOW),
+        )
+        rebuild_category_rollup(cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def rollup(self) -> set[tuple]:
+        return set(
+            CategoryMonthlyTotal.objects.filter(user=self.user).values_list(
+                "category_id", "year", "month", "type_transaction",
+                "total", "count",
+            )
+        )
+
+    def assertRollupRebuilt(self) -> None:
+        """Таблица сумм совпадает с результатом полного пересчета."""
+        maintained = self.rollup()
+        rebuild_category_rollup(self.user)
+        self.assertEqual(maintained, self.rollup())
+
+    def create_transaction(self) -> int:
+        response = self.client.post(
+            reverse("incomes") + "?type=expense",
+            {
+                "amount": "100.25",
+                "create_at": "2024-05-15T12:00:00+03:00",
+                "category": self.food.pk,
+                "account": self.card.pk,
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.data["id"]
+
+    def update_transaction(self, pk: int, **data) -> None:
+        response = self.client.put(
+            reverse("retrieve-update-delete-income", args=[pk]),
+            {
+                "amount": "100.25",
+                "create_at": "2024-05-15T12:00:00+03:00",
+                "category": self.food.pk,
+                "account": self.card.pk,
+                **data,
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_changes(self):
+        pk = self.create_transaction()
+        self.assertRollupRebuilt()
+
+        self.update_transaction(pk, category=self.cafe.pk, amount="40")
+        self.assertRollupRebuilt()
+
+        # 31 мая 22:30 UTC - уже 1 июня по Москве.
+        self.update_transaction(
+            pk, category=self.cafe.pk, create_at="2024-05-31T22:30:00Z"
+        )
+        self.assertIn((self.cafe.pk, 2024, 6), {
+            row[:3] for row in self.rollup()
+        })
+        self.assertRollupRebuilt()
+
+        response = self.client.delete(
+            reverse("retrieve-update-delete-income", args=[pk])
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertRollupRebuilt()
+
+    def test_delete_account(self):
+        self.create_transaction()
+        self.update_transaction(
+            self.create_transaction(), category=self.cafe.pk
+        )
+
+        response = self.client.delete(
+            reverse("retrieve-update-delete-account", args=[self.card.pk])
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.rollup(), {
+            (self.food.pk, 2024, 5, "expense", Decimal("7"), 1),
+        })
+        self.assertRollupRebuilt()
+
+    def test_admin_changes(self):
+        model_admin = TransactionAdmin(Transaction, site)
+        request = RequestFactory().post("/")
+        item = Transaction(
+            user=self.user,
+            category=self.food,
+            account=self.card,
+            amount=Decimal("15"),
+            create_at=datetime(2024, 4, 30, 23, tzinfo=MOSCOW),
+        )
+        model_admin.save_model(request, item, None, False)
+        self.assertRollupRebuilt()
+
+        item = Transaction.objects.get(pk=item.pk)
+        item.category = self.cafe
+        item.create_at = datetime(2024, 5, 1, 1, tzinfo=MOSCOW)
+        model_admin.save_model(request, item, None, True)
+        self.assertRollupRebuilt()
+
+        model_admin.delete_model(request, item)
+        self.assertRollupRebuilt()
+
+        model_admin.delete_queryset(
+            request, Transaction.objects.filter(user=self.user)
+        )
+        self.assertEqual(self.rollup(), set())
+
+
+class ListCategoryQueriesTest(TestCase):
+    """Число запросов списка категорий не зависит от размера страницы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("categories@example.com")
+        for number in range(12):
+            parent = Category.objects.create(
+                name=f"Категория {number}",
+                user=cls.user,
+                type_transaction="expense",
+            )
+            for child in range(3):
+                Category.objects.create(
+                    name=f"Подкатегория {number}.{child}",
+                    user=cls.user,
+                    type_transaction="expense",
+                    parent=parent,
+                    level=1,
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, **params) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("category"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), params["page_size"])
+        return len(queries)
+
+    def test_page_size_does_not_change_query_count(self):
+        self.assertEqual(
+            self.count_queries(page_size=2),
+            self.count_queries(page_size=12),
+        )
+
+    def test_root_categories_query_count(self):
+        self.assertEqual(
+            self.count_queries(page_size=2, parent="true"),
+            self.count_queries(page_size=12, parent="true"),
+        )
+
+
+class TransactionCursorPaginationTest(TestCase):
+    """Курсор по (create_at, id) проходит строки с одинаковым временем."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("cursor@example.com")
+        account = Account.objects.create(name="Карта", user=cls.user)
+        category = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        # Половина транзакций с одним временем, как при импорте.
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                category=category,
+                account=account,
+                amount=Decimal(number + 1),
+                create_at=datetime(
+                    2024, 5, 1 if number % 2 else 2 + number, tzinfo=MOSCOW
+                ),
+            )
+            for number in range(25)
+        )
+        cls.expected = list(
+            Transaction.objects.filter(user=cls.user)
+            .order_by("-create_at", "-id")
+            .values_list("id", flat=True)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def follow(self, url: str, link: str) -> tuple[list[list[int]], dict]:
+        """Проходит по ссылкам link, возвращает id страниц и ответ последней."""
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(
+                any("OFFSET" in query["sql"] for query in queries)
+            )
+            pages.append([item["id"] for item in response.data["results"]])
+            url = response.data[link]
+        return pages, response.data
+
+    def test_next_and_previous_links(self):
+        pages, last_page = self.follow(
+            reverse("incomes") + "?type=expense&pagination=cursor&page_size=4",
+            "next",
+        )
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual(len(pages), 7)
+
+        backwards, _ = self.follow(last_page["previous"], "previous")
+        self.assertEqual(backwards, pages[-2::-1])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("incomes"),
+            {"type": "expense", "pagination": "cursor", "cursor": "cD0x"},
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TransactionFilterExplainTest(TestCase):
+    """
+    Основные варианты TransactionFilter читают транзакции по индексам,
+    а не полным просмотром таблицы.
+    """
+
+    USERS = 10
+    TRANSACTIONS_PER_USER = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        transactions = []
+        for number in range(cls.USERS):
+            user = CustomUser.objects.create_user(
+                f"explain{number}@example.com"
+            )
+            accounts = [
+                Account.objects.create(name=name, user=user)
+                for name in ("Карта", "Наличные")
+            ]
+            categories = [
+                Category.objects.create(
+                    name=name, user=user, type_transaction="expense"
+                )
+                for name in ("Еда", "Транспорт", "Жилье", "Связь", "Отдых")
+            ]
+            transactions += [
+                Transaction(
+                    user=user,
+                    category=categories[item % len(categories)],
+                    account=accounts[item % len(accounts)],
+                    amount=Decimal(item % 500 + 1),
+                    create_at=datetime(2020, 1, 1, tzinfo=MOSCOW)
+                    + timedelta(hours=item * 13),
+                )
+                for item in range(cls.TRANSACTIONS_PER_USER)
+            ]
+        Transaction.objects.bulk_create(transactions, batch_size=5000)
+        cls.user = user
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Transaction._meta.db_table}")
+            cursor.execute(
+                "SELECT EXISTS "
+                "(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+            )
+            cls.trigram_available = cursor.fetchone()[0]
+
+    def explain(self, **params) -> str:
+        """План запроса первой страницы списка транзакций."""
+        queryset = (
+            Transaction.objects
+            .filter(user=self.user, category__type_transaction="expense")
+            .select_related("category__parent", "account")
+            .order_by("-create_at", "-id")
+        )
+        filterset = TransactionFilter(params, queryset=queryset)
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        return filterset.qs[:20].explain()
+
+    def assertNoSeqScan(self, **params) -> str:
+        plan = self.explain(**params)
+        self.assertNotRegex(
+            plan, rf"Seq Scan on {Transaction._meta.db_table}\b"
+        )
+        return plan
+
+    def assertRangeInIndexCond(self, plan: str) -> None:
+        """Диапазон дат ограничивает чтение индекса, а не фильтрует строки."""
+        self.assertRegex(plan, r"Index Cond: .*create_at >= .*create_at <=")
+
+    def skipWithoutTrigram(self) -> None:
+        if not self.trigram_available:
+            self.skipTest("Расширение pg_trgm не установлено.")
+
+    def test_create_at_range(self):
+        plan = self.assertNoSeqScan(
+            create_at_after="2021-03-01", create_at_before="2021-03-31"
+        )
+        self.assertRangeInIndexCond(plan)
+
+    def test_create_at_range_and_amount(self):
+        plan = self.assertNoSeqScan(
+            create_at_after="2021-03-01",
+            create_at_before="2021-06-30",
+            amount_gte="100",
+            amount_lte="200",
+        )
+        self.assertRangeInIndexCond(plan)
+
+    def test_category_name(self):
+        self.skipWithoutTrigram()
+        self.assertNoSeqScan(category_name="тран")
+
+    def test_account_name(self):
+        self.skipWithoutTrigram()
+        self.assertNoSeqScan(account_name="налич")
+
+
+class ImportTransactionsLookupTest(TestCase):
+    """Категории и счета импорта ищутся по id и по названию раздельно."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("import@example.com")
+        cls.account = Account.objects.create(name="Карта", user=cls.user)
+        cls.salary = Category.objects.create(
+            name="Зарплата", user=cls.user, type_transaction="income"
+        )
+        # Название совпадает с id другой категории.
+        cls.bonus = Category.objects.create(
+            name=str(cls.salary.pk), user=cls.user, type_transaction="income"
+        )
+
+    def import_row(self, category: str) -> int:
+        return import_transactions(self.user, "income", [{
+            "amount": "100",
+            "create_at": "2024-05-15T12:00:00+03:00",
+            "category": category,
+            "account": str(self.account.pk),
+        }])
+
+    def test_resolves_by_id_and_by_name(self):
+        self.assertEqual(self.import_row(str(self.bonus.pk)), 1)
+        self.assertEqual(self.import_row(" зарплата "), 1)
+        self.assertEqual(
+            list(
+                Transaction.objects.order_by("id")
+                .values_list("category", flat=True)
+            ),
+            [self.bonus.pk, self.salary.pk],
+        )
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, 200)
+
+    def test_id_matching_another_name_is_ambiguous(self):
+        with self.assertRaises(ImportAborted) as context:
+            self.import_row(str(self.salary.pk))
+
+        self.assertEqual(
+            context.exception.errors,
+            [{"row": 1, "errors": {
+                "category": ["Категория не найдена или неоднозначна."]
+            }}],
+        )
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransactionExportTest(TestCase):
+    """Выгрузка транзакций в CSV."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user("export@example.com")
+        account = Account.objects.create(name="Карта", user=cls.user)
+        category = Category.objects.create(
+            name="Еда", user=cls.user, type_transaction="expense"
+        )
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=cls.user,
+                category=category,
+                account=account,
+                amount=Decimal(number + 1),
+                create_at=datetime(2024, 5, 1 + number, tzinfo=MOSCOW),
+            )
+            for number in range(5)
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sync_stream(self):
+        response = self.client.get(reverse("export-transactions"))
+
+        self.assertFalse(response.is_async)
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 6)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_async_stream_under_asgi(self):
+        response = await sync_to_async(self.client.get)(
+            reverse("export-transactions")
+        )
+
+        self.assertTrue(response.is_async)
+        content = b"".join(
+            [chunk async for chunk in response.streaming_content]
+        )
+        self.assertEqual(len(content.decode().splitlines()), 6)
@@ -2,6 +2,8 @@ from django.urls import path
 
 from .views import (
     TransactionView,
+    TransactionImportView,
+    TransactionExportView,
     RetrieveUpdateDeleteTransaction,
     ListCategory,
     RetrieveUpdateDeleteCategory,
@@ -10,6 +12,16 @@ from .views import (
 
 urlpatterns = [
     path("", TransactionView.as_view(), name="incomes"),
+    path(
+        "import/",
+        TransactionImportView.as_view(),
+        name="import-transactions"
+    ),
+    path(
+        "export/",
+        TransactionExportView.as_view(),
+        name="export-transactions"
+    ),
     path(
         "<int:pk>/",
         RetrieveUpdateDeleteTransaction.as_view(),
@@ -0,0 +1,367 @@
+import csv
+import io
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+from typing import AsyncIterator, Generator, Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.db import transaction as db_transaction
+from django.db.models import Count, F, QuerySet, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from accounts.models import Account
+from accounts.util import change_balances
+from app_user.models import CustomUser
+from .models import Category, CategoryMonthlyTotal, Transaction
+from .serializers import TransactionImportSerializer
+
+RollupKey = tuple[int, int, int, int, str]
+
+IMPORT_BATCH_SIZE = 1000
+MAX_IMPORT_ERRORS = 100
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("create_at", "create_at"),
+    ("type", "category__type_transaction"),
+    ("category", "category__name"),
+    ("parent_category", "category__parent__name"),
+    ("account", "account__name"),
+    ("amount", "amount"),
+    ("comment", "comment"),
+)
+
+
+def rollup_deltas(
+    transactions: Iterable[Transaction], sign: int = 1
+) -> dict[RollupKey, list]:
+    """
+    Собирает изменения сумм по категориям за месяц для переданных
+    транзакций.
+
+    :param transactions: Транзакции, которые добавляются или удаляются.
+    :param sign: 1 для добавления транзакций, -1 для удаления.
+    :return: Словарь {(user, category, year, month, type): [сумма, кол-во]}.
+    """
+    deltas: dict[RollupKey, list] = defaultdict(lambda: [Decimal(0), 0])
+    for item in transactions:
+        local_date = timezone.localtime(item.create_at)
+        key = (
+            item.user_id,
+            item.category_id,
+            local_date.year,
+            local_date.month,
+            item.category.type_transaction,
+        )
+        deltas[key][0] += sign * item.amount
+        deltas[key][1] += sign
+    return deltas
+
+
+def merge_rollup_deltas(*deltas: dict[RollupKey, list]) -> dict:
+    """Объединяет несколько наборов изменений в один."""
+    merged: dict[RollupKey, list] = defaultdict(lambda: [Decimal(0), 0])
+    for item in deltas:
+        for key, (amount, count) in item.items():
+            merged[key][0] += amount
+            merged[key][1] += count
+    return merged
+
+
+def update_category_rollup(deltas: dict[RollupKey, list]) -> None:
+    """
+    Применяет изменения к таблице сумм по категориям.
+    Суммы изменяются через F(), поэтому параллельные запросы
+    не теряют обновления.
+
+    :param deltas: Изменения, полученные из rollup_deltas.
+    """
+    with db_transaction.atomic():
+        # Сортировка ключей задает одинаковый порядок блокировок строк.
+        for key in sorted(deltas):
+            amount, count = deltas[key]
+            if not amount and not count:
+                continue
+
+            user_id, category_id, year, month, type_tr = key
+            row, _ = CategoryMonthlyTotal.objects.get_or_create(
+                user_id=user_id,
+                category_id=category_id,
+                year=year,
+                month=month,
+                type_transaction=type_tr,
+            )
+            CategoryMonthlyTotal.objects.filter(pk=row.pk).update(
+                total=F("total") + amount, count=F("count") + count
+            )
+            CategoryMonthlyTotal.objects.filter(
+                pk=row.pk, count__lte=0
+            ).delete()
+
+
+def rollup_rows(transactions: QuerySet) -> QuerySet:
+    """
+    Группирует транзакции по пользователю, категории и месяцу
+    на стороне базы.
+
+    :param transactions: Транзакции, которые нужно сгруппировать.
+    :return: Выборка словарей с полями ключа, total и count.
+    """
+    return (
+        transactions
+        .annotate(
+            year=ExtractYear("create_at"),
+            month=ExtractMonth("create_at"),
+        )
+        .values(
+            "user_id",
+            "category_id",
+            "year",
+            "month",
+            "category__type_transaction",
+        )
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+
+
+def queryset_rollup_deltas(
+    transactions: QuerySet, sign: int = 1
+) -> dict[RollupKey, list]:
+    """
+    То же, что rollup_deltas, но суммы считаются в базе, без загрузки
+    транзакций. Подходит для удаления всех транзакций счета.
+
+    :param transactions: Транзакции, которые добавляются или удаляются.
+    :param sign: 1 для добавления транзакций, -1 для удаления.
+    :return: Словарь {(user, category, year, month, type): [сумма, кол-во]}.
+    """
+    return {
+        (
+            row["user_id"],
+            row["category_id"],
+            row["year"],
+            row["month"],
+            row["category__type_transaction"],
+        ): [sign * row["total"], sign * row["count"]]
+        for row in rollup_rows(transactions)
+    }
+
+
+def rebuild_category_rollup(user: CustomUser | None = None) -> int:
+    """
+    Полностью пересчитывает таблицу сумм по категориям из транзакций.
+
+    :param user: Пользователь, для которого пересчитываем данные.
+                 Если не передан - пересчет для всех пользователей.
+    :return: Количество созданных строк.
+    """
+    transactions = Transaction.objects.all()
+    totals = CategoryMonthlyTotal.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        totals = totals.filter(user=user)
+
+    with db_transaction.atomic():
+        totals.delete()
+        created = CategoryMonthlyTotal.objects.bulk_create(
+            (
+                CategoryMonthlyTotal(
+                    user_id=row["user_id"],
+                    category_id=row["category_id"],
+                    year=row["year"],
+                    month=row["month"],
+                    type_transaction=row["category__type_transaction"],
+                    total=row["total"],
+                    count=row["count"],
+                )
+                for row in rollup_rows(transactions).iterator(chunk_size=2000)
+            ),
+            batch_size=1000,
+        )
+    return len(created)
+
+
+class ImportAborted(Exception):
+    """Импорт отменен из-за ошибок в строках, ничего не сохранено."""
+
+    def __init__(self, errors: list[dict]):
+        super().__init__("Import aborted")
+        self.errors = errors
+
+
+class ImportLookup:
+    """
+    Поиск категорий и счетов импорта по id или по названию (без учета
+    регистра). Id и названия хранятся в разных словарях: значение,
+    которое совпадает с id одного объекта и названием другого, а также
+    название нескольких объектов считается неоднозначным.
+    """
+
+    def __init__(self, objects: Iterable):
+        self.by_id: dict[int, object] = {}
+        self.by_name: dict[str, object | None] = {}
+        for item in objects:
+            self.by_id[item.pk] = item
+            name = item.name.strip().lower()
+            self.by_name[name] = None if name in self.by_name else item
+
+    def get(self, value: str) -> object | None:
+        """
+        Возвращает объект по id или названию.
+        Если объект не найден или значение неоднозначно, возвращает None.
+        """
+        value = value.strip()
+        candidates = set()
+        if value.isdigit() and int(value) in self.by_id:
+            candidates.add(self.by_id[int(value)])
+        if value.lower() in self.by_name:
+            candidates.add(self.by_name[value.lower()])
+        return candidates.pop() if len(candidates) == 1 else None
+
+
+def import_transactions(
+    user: CustomUser, type_transaction: str, rows: Iterable[dict]
+) -> int:
+    """
+    Массово импортирует транзакции пользователя.
+    Строки валидируются пачками, категории и счета ищутся по словарям,
+    загруженным один раз, транзакции сохраняются через bulk_create.
+    Балансы счетов и суммы по категориям изменяются один раз
+    в конце импорта. Если хотя бы одна строка содержит ошибку,
+    импорт отменяется целиком.
+
+    :param user: Пользователь, для которого импортируются транзакции.
+    :param type_transaction: Тип транзакций (income, expense).
+    :param rows: Поток словарей с данными транзакций.
+    :return: Количество созданных транзакций.
+    """
+    categories = ImportLookup(
+        Category.objects.filter(user=user, type_transaction=type_transaction)
+    )
+    accounts = ImportLookup(
+        Account.objects.filter(user=user, is_system_account=False)
+    )
+    sign = 1 if type_transaction.startswith("inc") else -1
+
+    balance_deltas: dict[Account, Decimal] = defaultdict(Decimal)
+    totals: dict[RollupKey, list] = {}
+    errors: list[dict] = []
+    created = 0
+    row_number = 0
+    rows = iter(rows)
+
+    with db_transaction.atomic():
+        while batch := list(islice(rows, IMPORT_BATCH_SIZE)):
+            first_row = row_number + 1
+            row_number += len(batch)
+            serializer = TransactionImportSerializer(data=batch, many=True)
+            if not serializer.is_valid():
+                errors.extend(
+                    {"row": first_row + offset, "errors": row_errors}
+                    for offset, row_errors in enumerate(serializer.errors)
+                    if row_errors
+                )
+            if errors:
+                # После первой ошибки только проверяем оставшиеся строки.
+                if len(errors) >= MAX_IMPORT_ERRORS:
+                    break
+                continue
+
+            objects: list[Transaction] = []
+            for offset, data in enumerate(serializer.validated_data):
+                category = categories.get(data["category"])
+                account = accounts.get(data["account"])
+                row_errors = {}
+                if category is None:
+                    row_errors["category"] = [
+                        "Категория не найдена или неоднозначна."
+                    ]
+                if account is None:
+                    row_errors["account"] = [
+                        "Счет не найден или неоднозначен."
+                    ]
+                if row_errors:
+                    errors.append(
+                        {"row": first_row + offset, "errors": row_errors}
+                    )
+                    continue
+
+                objects.append(
+                    Transaction(
+                        user=user,
+                        category=category,
+                        account=account,
+                        amount=data["amount"],
+                        create_at=data["create_at"],
+                        comment=data["comment"],
+                    )
+                )
+                balance_deltas[account] += sign * data["amount"]
+
+            if errors:
+                continue
+
+            Transaction.objects.bulk_create(objects)
+            totals = merge_rollup_deltas(totals, rollup_deltas(objects))
+            created += len(objects)
+
+        if errors:
+            raise ImportAborted(errors[:MAX_IMPORT_ERRORS])
+
+        change_balances(balance_deltas.items())
+        update_category_rollup(totals)
+    return created
+
+
+def iter_transactions_csv(queryset: QuerySet) -> Iterator[str]:
+    """
+    Построчно выгружает транзакции в CSV.
+    Строки читаются из базы через values_list и iterator, без создания
+    моделей и без загрузки всей выборки в память. Ответ отдается
+    кусками по EXPORT_CHUNK_SIZE строк.
+
+    :param queryset: Отфильтрованные транзакции пользователя.
+    :return: Генератор кусков CSV-файла.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(name for name, _ in EXPORT_COLUMNS)
+
+    rows = (
+        queryset
+        .order_by("-create_at", "-id")
+        .values_list(*(field for _, field in EXPORT_COLUMNS))
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    for number, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if number % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def aiter_in_thread(
+    chunks: Generator[str, None, None]
+) -> AsyncIterator[str]:
+    """
+    Отдает куски синхронного генератора асинхронно. Каждый кусок
+    читается в потоке через sync_to_async, поэтому под ASGI выгрузка
+    передается клиенту по мере чтения из базы, а не собирается
+    в памяти целиком (так Django поступает с синхронными итераторами).
+
+    :param chunks: Генератор, например iter_transactions_csv.
+    :return: Асинхронный генератор тех же кусков.
+    """
+    done = object()
+    try:
+        while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+            yield chunk
+    finally:
+        # Закрывает курсор базы, если клиент отключился раньше.
+        await sync_to_async(chunks.close)()
@@ -1,7 +1,11 @@
 import decimal
 from datetime import datetime as dt, UTC
 
-from django.db.models import QuerySet, Count
+from django.conf import settings
+from django.db import connection, transaction as db_transaction
+from django.db.models import BooleanField, QuerySet, Count, Prefetch
+from django.db.models.expressions import RawSQL
+from django.http import StreamingHttpResponse
 from rest_framework import serializers
 from django_filters.rest_framework.backends import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
@@ -11,13 +15,26 @@ from rest_framework.authentication import (
     TokenAuthentication,
     BasicAuthentication,
 )
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.models import Account
+from accounts.util import change_balances
+from analytics.cache import invalidate_user_analytics
 from app_user.models import CustomUser
 from .filter import TransactionFilter, get_category_statistics
+from .parsers import CSVParser, JSONLinesParser
+from .util import (
+    ImportAborted,
+    aiter_in_thread,
+    import_transactions,
+    iter_transactions_csv,
+    rollup_deltas,
+    merge_rollup_deltas,
+    update_category_rollup,
+)
 from .models import Transaction, Category
 from .schemas import (
     TtransactionViewSchema,
@@ -25,9 +42,14 @@ from .schemas import (
     ListCategoryTransactionSchema,
     RetrieveUpdateDeleteCategoryTransactionSchema,
     transaction_statistic_schema,
+    transaction_import_schema,
+    transaction_export_schema,
 )
 from .serializers import (
     TransactionSerializer,
+    TransactionListSerializer,
+    TransactionImportSerializer,
+    TransactionImportResultSerializer,
     CategorySerializer,
     CategoryIDSerializers,
     TransactionSerializersAdd,
@@ -44,6 +66,88 @@ class Pagination(PageNumberPagination):
     max_page_size = 100
 
 
+class TransactionCursorPagination(CursorPagination):
+    """
+    Пагинация по курсору (keyset) для истории транзакций.
+    Позиция курсора - пара (create_at, id) крайней строки страницы,
+    следующая страница выбирается условием (create_at, id) < (%s, %s)
+    по индексу (user, -create_at, -id), без COUNT(*) и OFFSET. Время
+    получения страницы не зависит от ее глубины, а транзакции
+    с одинаковым временем не пропускаются и не повторяются.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-create_at", "-id")
+    position_separator = "|"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        position = self.cursor.position if self.cursor else None
+
+        # Обратный курсор (ссылка previous) читает строки по возрастанию.
+        if reverse:
+            queryset = queryset.order_by("create_at", "id")
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(
+                self.position_filter(position, after=reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > self.page_size else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.next_position = position
+            self.has_previous = following is not None
+            self.previous_position = following
+        else:
+            self.has_next = following is not None
+            self.next_position = following
+            self.has_previous = position is not None
+            self.previous_position = position
+
+        if (self.has_previous or self.has_next) and self.template:
+            self.display_page_controls = True
+        return self.page
+
+    def position_filter(self, position: str, after: bool) -> RawSQL:
+        """
+        Условие строк после позиции курсора (after=True)
+        или до нее в порядке по убыванию (create_at, id).
+        """
+        try:
+            create_at, pk = position.rsplit(self.position_separator, 1)
+            params = (dt.fromisoformat(create_at), int(pk))
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        return RawSQL(
+            f"({table}.create_at, {table}.id) {'>' if after else '<'} "
+            "(%s, %s)",
+            params,
+            output_field=BooleanField(),
+        )
+
+    def _get_position_from_instance(self, instance, ordering) -> str:
+        return (
+            f"{instance.create_at.isoformat()}"
+            f"{self.position_separator}{instance.pk}"
+        )
+
+
 @extend_schema(tags=["Transactions"])
 @TtransactionViewSchema
 class TransactionView(generics.ListCreateAPIView):
@@ -52,7 +156,7 @@ class TransactionView(generics.ListCreateAPIView):
     """
     queryset = Transaction.objects.none()
     pagination_class = Pagination
-    serializer_class = TransactionSerializer
+    serializer_class = TransactionListSerializer
     permission_classes = (IsAuthenticated,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TransactionFilter
@@ -66,34 +170,52 @@ class TransactionView(generics.ListCreateAPIView):
         """
         Метод переопределен для фильтрации доходов по пользователю.
         """
-        queryset = Transaction.objects.filter(user=self.request.user)
+        queryset = (
+            Transaction.objects
+            .filter(user=self.request.user)
+            .select_related("category__parent", "account")
+        )
         if transaction_type := self.request.query_params.get('type'):
             queryset = queryset.filter(
                 category__type_transaction=transaction_type
             )
         return queryset
 
+    @property
+    def paginator(self):
+        """
+        Пагинация по курсору включается параметром pagination=cursor,
+        по умолчанию используется пагинация по номеру страницы.
+        """
+        if not hasattr(self, "_paginator"):
+            if self.request.query_params.get("pagination") == "cursor":
+                self._paginator = TransactionCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
     def get_serializer_class(self):
         """
         Выбор сериализатора в зависимости от метода.
         """
         if self.request.method == "POST":
             return TransactionSerializersAdd
-        return TransactionSerializer
+        return TransactionListSerializer
 
+    @db_transaction.atomic
     def perform_create(self, serializer) -> None:
         """
         Добавление баланса в выбранный счет.
         """
         type_transaction = self.request.query_params.get('type')
         transaction: Transaction = serializer.save(user=self.request.user)
-        account: Account = transaction.account
+        amount: decimal = transaction.amount
 
-        if type_transaction.startswith("inc"):
-            account.balance += transaction.amount
-        else:
-            account.balance -= transaction.amount
-        account.save()
+        if not type_transaction.startswith("inc"):
+            amount = -amount
+        change_balances([(transaction.account, amount)])
+        update_category_rollup(rollup_deltas([transaction]))
+        invalidate_user_analytics(transaction.user_id)
 
     def create(self, request, *args, **kwargs):
         """
@@ -113,6 +235,100 @@ class TransactionView(generics.ListCreateAPIView):
         )
 
 
+@extend_schema(tags=["Transactions"])
+@transaction_import_schema
+class TransactionImportView(generics.GenericAPIView):
+    """
+    Класс для массового импорта транзакций из CSV или JSON lines.
+    Тело запроса читается потоком, строки сохраняются пачками.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = (
+        TokenAuthentication,
+        BasicAuthentication,
+        SessionAuthentication,
+    )
+    parser_classes = (CSVParser, JSONLinesParser)
+    serializer_class = TransactionImportSerializer
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        Метод для импорта транзакций.
+        :return: Количество созданных транзакций или список ошибок по строкам.
+        """
+        type_transaction: str = request.query_params.get("type", "")
+        if not type_transaction:
+            return Response(
+                {"detail": "Тип транзакции обязателен."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            created: int = import_transactions(
+                request.user, type_transaction, request.data
+            )
+        except ImportAborted as exc:
+            return Response(
+                {
+                    "detail": "Импорт отменен: найдены ошибки в строках.",
+                    "errors": exc.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        invalidate_user_analytics(request.user.id)
+        serializer = TransactionImportResultSerializer({"created": created})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema(tags=["Transactions"])
+@transaction_export_schema
+class TransactionExportView(generics.GenericAPIView):
+    """
+    Класс для потоковой выгрузки транзакций в CSV.
+    """
+
+    queryset = Transaction.objects.none()
+    permission_classes = (IsAuthenticated,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = TransactionFilter
+    authentication_classes = (
+        TokenAuthentication,
+        BasicAuthentication,
+        SessionAuthentication,
+    )
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Метод переопределен для фильтрации транзакций по пользователю.
+        """
+        queryset = Transaction.objects.filter(user=self.request.user)
+        if transaction_type := self.request.query_params.get("type"):
+            queryset = queryset.filter(
+                category__type_transaction=transaction_type
+            )
+        return queryset
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        """
+        Метод для выгрузки транзакций.
+        :return: CSV-файл, который отдается по мере чтения из базы.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        content = iter_transactions_csv(queryset)
+        if settings.ASYNC_VIEWS:
+            content = aiter_in_thread(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            'attachment; filename="transactions.csv"'
+        )
+        return response
+
+
 @extend_schema(tags=["Transactions"])
 @RetrieveUpdateDeleteTransactionSchema
 class RetrieveUpdateDeleteTransaction(generics.RetrieveUpdateDestroyAPIView):
@@ -149,22 +365,23 @@ class RetrieveUpdateDeleteTransaction(generics.RetrieveUpdateDestroyAPIView):
         """
         return Transaction.objects.filter(user=self.request.user)
 
+    @db_transaction.atomic
     def perform_destroy(self, instance: Transaction) -> None:
         """
         Переопределяем метод, чтобы вычесть сумму дохода из баланса счета,
         на который был доход.
         :param instance: Объект дохода.
         """
-        account: Account = instance.account  # Получаем счет
         amount: decimal = instance.amount  # Сохраняем сумму дохода
 
         if instance.category.type_transaction == "income":
-            account.balance -= amount
-        else:
-            account.balance += amount
-        account.save()
+            amount = -amount
+        change_balances([(instance.account, amount)])
+        update_category_rollup(rollup_deltas([instance], sign=-1))
+        invalidate_user_analytics(instance.user_id)
         instance.delete()
 
+    @db_transaction.atomic
     def perform_update(self, serializer: TransactionSerializer) -> None:
         """
         Переопределяем метод для обновления дохода и корректировки
@@ -183,24 +400,20 @@ class RetrieveUpdateDeleteTransaction(generics.RetrieveUpdateDestroyAPIView):
             "amount", old_amount
         )
 
-        serializer.save()
+        old_totals = rollup_deltas([instance], sign=-1)
+        updated: Transaction = serializer.save()
+        update_category_rollup(
+            merge_rollup_deltas(old_totals, rollup_deltas([updated]))
+        )
 
-        if new_account != old_account:
-            if type_transaction.startswith("exp"):
-                old_account.balance += old_amount
-                new_account.balance -= new_amount
-            else:
-                old_account.balance -= old_amount
-                new_account.balance += new_amount
-            Account.objects.bulk_update(
-                (new_account, old_account), ["balance"]
-            )
-        else:
-            if type_transaction.startswith("inc"):
-                old_account.balance += new_amount - old_amount
-            else:
-                old_account.balance += old_amount - new_amount
-            old_account.save()
+        # Отменяем старую сумму на старом счете и применяем новую
+        # на новом. Если счет не менялся, изменения суммируются.
+        if type_transaction.startswith("exp"):
+            old_amount, new_amount = -old_amount, -new_amount
+        change_balances(
+            [(old_account, -old_amount), (new_account, new_amount)]
+        )
+        invalidate_user_analytics(updated.user_id)
 
 
 @extend_schema(tags=["TransactionCategory"])
@@ -251,7 +464,14 @@ class ListCategory(generics.ListCreateAPIView):
             )
         if transaction_type := self.request.query_params.get('type'):
             queryset = queryset.filter(type_transaction=transaction_type)
-        return queryset
+        # Дети загружаются одним запросом на страницу, has_children
+        # и children сериализатора берутся из этого кэша.
+        return queryset.prefetch_related(
+            Prefetch(
+                "children",
+                queryset=Category.objects.only("id", "name", "parent_id")
+            )
+        )
 
     def perform_create(self, serializer):
         """
@@ -306,6 +526,14 @@ class RetrieveUpdateDeleteCategory(generics.RetrieveUpdateDestroyAPIView):
         """
         return Category.objects.filter(user=self.request.user)
 
+    def perform_destroy(self, instance: Category) -> None:
+        """
+        Вместе с категорией удаляются ее транзакции,
+        поэтому сбрасываем кеш аналитики пользователя.
+        """
+        instance.delete()
+        invalidate_user_analytics(instance.user_id)
+
 
 @transaction_statistic_schema
 class CategoryTransactionStatisticsView(generics.GenericAPIView):
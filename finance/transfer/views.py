@@ -1,5 +1,6 @@
 import decimal
 
+from django.db import transaction
 from django.db.models import QuerySet, Q
 from drf_spectacular.utils import extend_schema
 from rest_framework import generics, status
@@ -13,6 +14,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.models import Account
+from accounts.util import change_balances
 from .schemas import (
     TransferSchema,
     TransferHistoryViewSchema,
@@ -38,6 +40,7 @@ class TransferFundsView(generics.CreateAPIView):
         SessionAuthentication,
     )
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
         Переопределяем метод для перевода баланса между счетами.
@@ -48,11 +51,9 @@ class TransferFundsView(generics.CreateAPIView):
         ]
         amount = serializer.validated_data["amount"]
 
-        source_account.balance -= amount
-        destination_account.balance += amount
-
-        source_account.save()
-        destination_account.save()
+        change_balances(
+            [(source_account, -amount), (destination_account, amount)]
+        )
 
         transfer = serializer.save()
         return transfer
@@ -131,6 +132,7 @@ class TransferDetailView(generics.RetrieveUpdateDestroyAPIView):
             .order_by("-timestamp")
         )
 
+    @transaction.atomic
     def perform_update(self, serializer):
         """
         Изменяем балансы счетов при редактировании.
@@ -145,13 +147,15 @@ class TransferDetailView(generics.RetrieveUpdateDestroyAPIView):
         destination_account: Account = transfer.destination_account
 
         if new_amount != old_amount:
-            source_account.balance += old_amount - new_amount
-            destination_account.balance -= old_amount - new_amount
-
-            source_account.save()
-            destination_account.save()
+            change_balances(
+                [
+                    (source_account, old_amount - new_amount),
+                    (destination_account, new_amount - old_amount),
+                ]
+            )
         serializer.save()
 
+    @transaction.atomic
     def perform_destroy(self, instance):
         """
         Откат баланса счетов при удалении перевода.
@@ -160,9 +164,10 @@ class TransferDetailView(generics.RetrieveUpdateDestroyAPIView):
         source_account: Account = instance.source_account
         destination_account: Account = instance.destination_account
 
-        source_account.balance += instance.amount
-        destination_account.balance -= instance.amount
-
-        source_account.save()
-        destination_account.save()
+        change_balances(
+            [
+                (source_account, instance.amount),
+                (destination_account, -instance.amount),
+            ]
+        )
         instance.delete()
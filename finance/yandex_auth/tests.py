@@ -0,0 +1,132 @@
+import json
+from unittest import mock
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from app_user.models import CustomUser
+from .views import AsyncYandexCallbackView, YandexCallbackView
+
+PROFILE = {
+    "id": "1001",
+    "default_email": "yandex@example.com",
+    "first_name": "Иван",
+    "last_name": "Петров",
+}
+
+
+class YandexCallbackTests:
+    """
+    Общие проверки для синхронного и async обработчика.
+    Ответы Яндекса задаются функцией answer.
+    """
+
+    def setUp(self):
+        self.sent = []
+        self.token_data = {"access_token": "yandex-token"}
+
+    def answer(self, request: httpx.Request) -> httpx.Response:
+        self.sent.append(request)
+        if request.url.host == "oauth.yandex.ru":
+            return httpx.Response(200, json=self.token_data, request=request)
+        return httpx.Response(200, json=PROFILE, request=request)
+
+    async def callback(self, **params):
+        raise NotImplementedError
+
+    def assertError(self, response, status_code: int, detail: str) -> None:
+        self.assertEqual(response.status_code, status_code)
+        self.assertEqual(json.loads(response.content), {"detail": detail})
+
+    @override_settings(FRONTEND_URL="https://finance.example.com")
+    async def test_creates_user_and_redirects_with_token(self):
+        response = await self.callback(code="secret")
+
+        user = await CustomUser.objects.aget(yandex_id="1001")
+        token = await Token.objects.aget(user=user)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            response["Location"],
+            f"https://finance.example.com/oauth-callback?token={token.key}",
+        )
+        self.assertEqual(user.email, "yandex@example.com")
+        self.assertEqual(self.sent[0].method, "POST")
+        self.assertIn(b"code=secret", self.sent[0].content)
+        self.assertEqual(
+            self.sent[1].headers["Authorization"], "OAuth yandex-token"
+        )
+
+    async def test_code_missing(self):
+        self.assertError(await self.callback(), 400, "code missing")
+        self.assertEqual(self.sent, [])
+
+    async def test_no_access_token(self):
+        self.token_data = {}
+        self.assertError(
+            await self.callback(code="secret"),
+            500,
+            "no access_token from Yandex",
+        )
+        self.assertEqual(len(self.sent), 1)
+
+    async def test_token_exchange_failed(self):
+        self.fail_requests()
+        self.assertError(
+            await self.callback(code="secret"),
+            500,
+            "yandex token exchange failed",
+        )
+        self.assertFalse(await CustomUser.objects.aexists())
+
+
+class YandexCallbackViewTest(YandexCallbackTests, TestCase):
+    """Синхронный обработчик, запросы через requests."""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch(
+            "yandex_auth.views.requests.request", side_effect=self.send
+        )
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def send(self, method: str, url: str, timeout: int, **kwargs):
+        return self.answer(httpx.Client().build_request(method, url, **kwargs))
+
+    def fail_requests(self) -> None:
+        self.request.side_effect = requests.ConnectionError("refused")
+
+    async def callback(self, **params):
+        request = AsyncRequestFactory().get("/auth/yandex/callback/", params)
+        response = await sync_to_async(YandexCallbackView.as_view())(request)
+        if hasattr(response, "render"):
+            await sync_to_async(response.render)()
+        return response
+
+
+class AsyncYandexCallbackViewTest(YandexCallbackTests, TestCase):
+    """Async обработчик, запросы через общий клиент httpx."""
+
+    def setUp(self):
+        super().setUp()
+        self.yandex = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.answer)
+        )
+        patcher = mock.patch(
+            "yandex_auth.views.get_async_client", return_value=self.yandex
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def refuse(self, request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    def fail_requests(self) -> None:
+        self.yandex._transport = httpx.MockTransport(self.refuse)
+
+    async def callback(self, **params):
+        request = AsyncRequestFactory().get("/auth/yandex/callback/", params)
+        return await AsyncYandexCallbackView.as_view()(request)
@@ -1,7 +1,12 @@
+from django.conf import settings
 from django.urls import path
-from .views import YandexCallbackView, yandex_login
+from .views import AsyncYandexCallbackView, YandexCallbackView, yandex_login
+
+callback_view = (
+    AsyncYandexCallbackView if settings.ASYNC_VIEWS else YandexCallbackView
+)
 
 urlpatterns = [
     path('login/', yandex_login, name='yandex-login'),
-    path('callback/', YandexCallbackView.as_view(), name='yandex-callback'),
+    path('callback/', callback_view.as_view(), name='yandex-callback'),
 ]
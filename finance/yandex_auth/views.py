@@ -1,19 +1,22 @@
 import random
 import string
 from urllib.parse import urlencode
+import httpx
 import requests
 import logging
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.http import HttpResponseRedirect
 from django.contrib.auth import get_user_model
+from rest_framework.exceptions import APIException, ParseError
 from rest_framework.views import APIView
-from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from djoser.utils import login_user
 
 from app_user.models import CustomUser
+from finance.async_views import AsyncAPIView
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -23,6 +26,31 @@ User: CustomUser = get_user_model()
 YANDEX_AUTH_URL = "https://oauth.yandex.ru/authorize"
 YANDEX_TOKEN_URL = "https://oauth.yandex.ru/token"
 YANDEX_INFO_URL = "https://login.yandex.ru/info"
+YANDEX_TIMEOUT = 10
+
+TOKEN_EXCHANGE_FAILED = "yandex token exchange failed"
+PROFILE_FETCH_FAILED = "yandex profile fetch failed"
+
+_async_client: httpx.AsyncClient | None = None
+
+
+class YandexAuthFailed(APIException):
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+    default_detail = "Yandex authorization failed."
+    default_code = "yandex_auth_failed"
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the worker's async client for Yandex requests.
+
+    The client is created on first use, inside the running event loop of
+    the ASGI worker, and then reused, so connections to Yandex are pooled.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=YANDEX_TIMEOUT)
+    return _async_client
 
 
 def yandex_login(request) -> HttpResponseRedirect:
@@ -37,62 +65,53 @@ def yandex_login(request) -> HttpResponseRedirect:
     return HttpResponseRedirect(url)
 
 
-class YandexCallbackView(APIView):
-    permission_classes = [AllowAny]
-    authentication_classes = []
-
-    def _exchange_code_for_access_token(self, code: str) -> dict | Response:
-        """Request user data from Yandex."""
-        redirect_uri: str = self.request.build_absolute_uri("/auth/yandex/callback/")
-        try:
-            request: requests.Response = requests.post(
-                YANDEX_TOKEN_URL,
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "client_id": settings.YANDEX_CLIENT_ID,
-                    "client_secret": settings.YANDEX_CLIENT_SECRET,
-                    "redirect_uri": redirect_uri,
-                },
-                timeout=10,
-            )
-            request.raise_for_status()
-            logger.info(f"Token exchange successful")
-            return request.json()
-
-        except Exception as e:
-            logger.error(f"Yandex token exchange failed: {e}")
-            return Response(
-                {"detail": "yandex token exchange failed"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+class YandexUserMixin:
+    """
+    The Yandex OAuth callback flow without the HTTP calls: building the
+    requests to Yandex, creating or updating the user from the profile
+    and the redirect to the frontend. Errors are raised as APIExceptions
+    and rendered by the view.
+    """
 
-    def _get_profile(self, token_data: dict):
-        """Get the user's profile."""
+    def _get_code(self, request) -> str:
+        code: str = request.GET.get("code")
+        if not code:
+            raise ParseError("code missing")
+        return code
+
+    def _token_request(self, request, code: str) -> dict:
+        """Arguments of the request exchanging the code for a token."""
+        redirect_uri: str = request.build_absolute_uri("/auth/yandex/callback/")
+        return {
+            "method": "POST",
+            "url": YANDEX_TOKEN_URL,
+            "data": {
+                "grant_type": "authorization_code",
+                "code": code,
+                "client_id": settings.YANDEX_CLIENT_ID,
+                "client_secret": settings.YANDEX_CLIENT_SECRET,
+                "redirect_uri": redirect_uri,
+            },
+        }
+
+    def _profile_request(self, token_data: dict) -> dict:
+        """Arguments of the request for the user's profile."""
+        logger.info("Token exchange successful")
         yandex_access_token = token_data.get("access_token")
         if not yandex_access_token:
             logger.error("No access_token from Yandex")
-            return Response(
-                {"detail": "no access_token from Yandex"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-        try:
-            request: requests.Response = requests.get(
-                YANDEX_INFO_URL,
-                headers={"Authorization": f"OAuth {yandex_access_token}"},
-                timeout=10,
-            )
-            request.raise_for_status()
-            return request.json()
-
-        except Exception as e:
-            logger.error(f"Yandex profile fetch failed: {e}")
-            return Response(
-                {"detail": "yandex profile fetch failed"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-    def _user_extraction(self, yandex_info: dict) -> tuple[int, str, str, str] | Response:
+            raise YandexAuthFailed("no access_token from Yandex")
+        return {
+            "method": "GET",
+            "url": YANDEX_INFO_URL,
+            "headers": {"Authorization": f"OAuth {yandex_access_token}"},
+        }
+
+    def _request_failed(self, detail: str, error: Exception) -> YandexAuthFailed:
+        logger.error(f"{detail.capitalize()}: {error}")
+        return YandexAuthFailed(detail)
+
+    def _user_extraction(self, yandex_info: dict) -> tuple[int, str, str, str]:
         """Extract user data."""
         yandex_id: int = yandex_info.get("id")
         email: str = yandex_info.get("default_email", "")
@@ -102,10 +121,7 @@ class YandexCallbackView(APIView):
 
         if not yandex_id:
             logger.error("No yandex_id in response")
-            return Response(
-                {"detail": "no yandex_id"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            raise YandexAuthFailed("no yandex_id")
         if not email:
             logger.warning("No email from Yandex, using yandex_id as email")
             email = f"yandex_{yandex_id}@yandex.ru"
@@ -128,10 +144,7 @@ class YandexCallbackView(APIView):
 
         except Exception as e:
             logger.error(f"Failed to create user: {e}")
-            return Response(
-                {"detail": f"Failed to create user: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            raise YandexAuthFailed(f"Failed to create user: {str(e)}")
 
     def _search_user(self, user_data: tuple) -> CustomUser:
         """Search for a user in the database."""
@@ -162,20 +175,10 @@ class YandexCallbackView(APIView):
             logger.info(f"User with yandex_id {yandex_id} not found")
             return self._create_new_user(user_data)
 
-    def get(self, request):
-        code: str = request.GET.get("code")
-        if not code:
-            return Response(
-                {"detail": "code missing"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        token_data = self._exchange_code_for_access_token(code)
-        yandex_info = self._get_profile(token_data)
+    def _login_redirect(self, request, yandex_info: dict) -> HttpResponseRedirect:
+        """Log the Yandex user in and redirect to the frontend with a token."""
         logger.info(f"Yandex user info: {yandex_info}")
-
-        yandex_user = self._user_extraction(yandex_info)
-        user: CustomUser = self._search_user(yandex_user)
+        user: CustomUser = self._search_user(self._user_extraction(yandex_info))
 
         # Генерируем токен
         try:
@@ -183,13 +186,68 @@ class YandexCallbackView(APIView):
             logger.info(f"Token generated successfully")
         except Exception as e:
             logger.error(f"Failed to generate token: {e}")
-            return Response(
-                {"detail": "Failed to generate token"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            raise YandexAuthFailed("Failed to generate token")
 
         # Редирект на фронтенд
         frontend_url = settings.FRONTEND_URL
         redirect_url = f"{frontend_url}/oauth-callback?token={tokens.key}"
         logger.info(f"Redirecting to: {redirect_url}")
         return HttpResponseRedirect(redirect_url)
+
+
+class YandexCallbackView(YandexUserMixin, APIView):
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def _request_yandex(self, error: str, method: str, url: str, **kwargs) -> dict:
+        """Send a request to Yandex and return the JSON body."""
+        try:
+            response: requests.Response = requests.request(
+                method, url, timeout=YANDEX_TIMEOUT, **kwargs
+            )
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise self._request_failed(error, e)
+
+    def get(self, request):
+        code = self._get_code(request)
+        token_data = self._request_yandex(
+            TOKEN_EXCHANGE_FAILED, **self._token_request(request, code),
+        )
+        yandex_info = self._request_yandex(
+            PROFILE_FETCH_FAILED, **self._profile_request(token_data),
+        )
+        return self._login_redirect(request, yandex_info)
+
+
+class AsyncYandexCallbackView(YandexUserMixin, AsyncAPIView):
+    """
+    Async version of YandexCallbackView for ASGI deployments.
+    Requests to Yandex do not hold a worker thread, database
+    work runs in a thread through sync_to_async. Throttling and
+    error responses are those of YandexCallbackView.
+    """
+
+    api_view_class = YandexCallbackView
+
+    async def _request_yandex(
+        self, error: str, method: str, url: str, **kwargs
+    ) -> dict:
+        """Send a request to Yandex and return the JSON body."""
+        try:
+            response = await get_async_client().request(method, url, **kwargs)
+            response.raise_for_status()
+            return response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise self._request_failed(error, e)
+
+    async def get(self, request):
+        code = self._get_code(request)
+        token_data = await self._request_yandex(
+            TOKEN_EXCHANGE_FAILED, **self._token_request(request, code),
+        )
+        yandex_info = await self._request_yandex(
+            PROFILE_FETCH_FAILED, **self._profile_request(token_data),
+        )
+        return await sync_to_async(self._login_redirect)(request, yandex_info)
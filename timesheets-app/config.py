@@ -5,3 +5,19 @@ DB_MONGO_NAME = config("DB_MONGO_NAME")
 DB_MONGO_PASS = config("DB_MONGO_PASS")
 
 cashed_currency = {}
+
+# Recalculate the shifts of a month (read and write) in a transaction, so
+# readers never see the month half updated and concurrent recalculations
+# do not overwrite each other. Transactions require MongoDB running as a
+# replica set (a single-node one is enough) or behind mongos. On a
+# standalone server, like the mongodb service of docker-compose.yaml,
+# the first attempt fails with error code 20 and the shifts are
+# recalculated without a transaction from then on.
+SALARY_TRANSACTIONS = config("SALARY_TRANSACTIONS", default=True, cast=bool)
+
+# How often the MongoDB connection is checked in the background, seconds.
+MONGO_HEARTBEAT_INTERVAL = config("MONGO_HEARTBEAT_INTERVAL", default=10, cast=float)
+
+# MongoDB connection pool of one gunicorn worker.
+MONGO_MAX_POOL_SIZE = config("MONGO_MAX_POOL_SIZE", default=100, cast=int)
+MONGO_MIN_POOL_SIZE = config("MONGO_MIN_POOL_SIZE", default=10, cast=int)
@@ -1,5 +1,22 @@
+import logging
+from typing import Awaitable, Callable
+
 import pymongo
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from config import SALARY_TRANSACTIONS
+
+logger = logging.getLogger(__name__)
+
+# The server error code when transactions are not supported (standalone).
+ILLEGAL_OPERATION = 20
+
+# Cleared when the server reports that it does not support transactions.
+_transactions_supported = True
+
+# Fields of a shift that exist only if the user has overworked.
+OVERTIME_FIELDS = ("hours_overtime", "earned_overtime")
 
 
 async def add_many_shifts(shifts: list[dict], db: AsyncIOMotorDatabase) -> None:
@@ -10,9 +27,6 @@ async def add_many_shifts(shifts: list[dict], db: AsyncIOMotorDatabase) -> None:
     :param shifts: A dictionary list with data to be added to the database.
     """
     collection = db.get_collection("salaries")
-    await collection.create_index(
-        [("user_id", 1), ("date", 1)], unique=True, name="unique_user_date"
-    )
 
     operations = []
     for shift in shifts:
@@ -26,3 +40,72 @@ async def add_many_shifts(shifts: list[dict], db: AsyncIOMotorDatabase) -> None:
 
     if operations:
         await collection.bulk_write(operations, ordered=False)
+
+
+async def update_many_shifts(
+    shifts: list[dict],
+    db: AsyncIOMotorDatabase,
+    session: AsyncIOMotorClientSession | None = None,
+) -> None:
+    """
+    Save recalculated shifts with one ordered bulk write. Existing shifts
+    are updated by ID, new ones are added by user and date. Overtime
+    fields that are missing in the recalculated shift are removed.
+
+    :param db: Database.
+    :param shifts: A dictionary list with recalculated shifts.
+    :param session: The session of the transaction, if there is one.
+    """
+    collection = db.get_collection("salaries")
+
+    operations = []
+    for shift in shifts:
+        shift = dict(shift)
+        day_id = shift.pop("_id", None)
+        if day_id is None:
+            query = {"user_id": shift["user_id"], "date": shift["date"]}
+        else:
+            query = {"_id": day_id}
+
+        update: dict = {"$set": shift}
+        unset = {field: "" for field in OVERTIME_FIELDS if field not in shift}
+        if unset:
+            update["$unset"] = unset
+        operations.append(pymongo.UpdateOne(query, update, upsert=day_id is None))
+
+    if operations:
+        await collection.bulk_write(operations, ordered=True, session=session)
+
+
+async def run_in_transaction(
+    db: AsyncIOMotorDatabase,
+    callback: Callable[[AsyncIOMotorClientSession | None], Awaitable[None]],
+) -> None:
+    """
+    Run callback(session) in a transaction. The callback must do its
+    reads as well as its writes with the session: on a transient error,
+    e.g. a write conflict with a concurrent recalculation of the same
+    month, the whole callback runs again on the committed data.
+
+    Transactions require a replica set or mongos. On a standalone server
+    (error code 20) transactions are disabled for the process and the
+    callback runs without a session, as it does with
+    SALARY_TRANSACTIONS=False.
+
+    :param db: Database.
+    :param callback: Coroutine function taking the session or None.
+    """
+    global _transactions_supported
+    if SALARY_TRANSACTIONS and _transactions_supported:
+        try:
+            async with await db.client.start_session() as session:
+                await session.with_transaction(callback)
+            return
+        except OperationFailure as e:
+            if e.code != ILLEGAL_OPERATION:
+                raise
+            # The first command of the transaction fails, nothing is written.
+            logger.warning(f"Transactions are not supported, disabled: {e}")
+            _transactions_supported = False
+
+    await callback(None)
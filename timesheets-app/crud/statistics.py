@@ -1,12 +1,16 @@
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from fastapi import HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
 from starlette import status
 
 
 async def get_information_for_month(
-    user_id: int, year: int, month: int, db: AsyncIOMotorDatabase
+    user_id: int,
+    year: int,
+    month: int,
+    db: AsyncIOMotorDatabase,
+    session: AsyncIOMotorClientSession | None = None,
 ) -> list:
     """
     Get the data for the selected month.
@@ -15,6 +19,7 @@ async def get_information_for_month(
     :param user_id: The user's ID.
     :param year: The transmitted year.
     :param month: The transferred month.
+    :param session: The session of the transaction, if there is one.
     """
     collection = db.get_collection("salaries")
     start_date = datetime(year, month, 1)
@@ -23,7 +28,8 @@ async def get_information_for_month(
         {
             "user_id": user_id,
             "date": {"$gte": start_date, "$lt": end_date},
-        }
+        },
+        session=session,
     )
     results = await cursor.to_list(length=None)
     return results
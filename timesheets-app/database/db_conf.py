@@ -6,7 +6,12 @@ from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.errors import ServerSelectionTimeoutError, ConnectionFailure
 
-from config import DB_MONGO_NAME, DB_MONGO_PASS
+from config import (
+    DB_MONGO_NAME,
+    DB_MONGO_PASS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -27,25 +32,38 @@ class MongoDB:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self):
-        if self._client is None:
-            self._connect()
-
-    def _connect(self):
-        """Создает новое соединение с базой данных."""
+    def _create_client(self) -> AsyncIOMotorClient:
+        """
+        Создает клиент MongoDB. Размер пула задается на один воркер,
+        у каждого воркера gunicorn свой клиент.
+        """
+        return AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            connectTimeoutMS=5000,
+            serverSelectionTimeoutMS=5000,
+            socketTimeoutMS=30000,
+            # Автоматическое переподключение
+            retryWrites=True,
+            retryReads=True,
+        )
+
+    def _set_client(self, client: AsyncIOMotorClient) -> None:
+        """Заменяет клиент, закрывая предыдущий и его пул соединений."""
+        old_client, self._client = self._client, client
+        self._db = client[DB_MONGO_NAME]
+        if old_client is not None:
+            old_client.close()
+
+    def connect(self) -> None:
+        """
+        Создает соединение с базой данных. Вызывается при запуске
+        воркера, а не при импорте: клиент motor нельзя использовать
+        после fork, поэтому каждый воркер создает свой.
+        """
         try:
-            self._client = AsyncIOMotorClient(
-                MONGO_URI,
-                maxPoolSize=100,
-                minPoolSize=10,
-                connectTimeoutMS=5000,
-                serverSelectionTimeoutMS=5000,
-                socketTimeoutMS=30000,
-                # Автоматическое переподключение
-                retryWrites=True,
-                retryReads=True,
-            )
-            self._db = self._client[DB_MONGO_NAME]
+            self._set_client(self._create_client())
             self._is_connected = True
             logger.info("Successfully connected to MongoDB")
         except Exception as e:
@@ -59,10 +77,12 @@ class MongoDB:
         Возвращает True если соединение установлено.
         """
         async with self._reconnect_lock:
-            if self._is_connected:
+            if self._client is not None:
                 try:
-                    # Проверяем, живое ли соединение
+                    # Проверяем, живое ли соединение. Пул motor сам
+                    # восстанавливается, если сервер снова доступен.
                     await self._client.admin.command("ping")
+                    self._is_connected = True
                     return True
                 except (ServerSelectionTimeoutError, ConnectionFailure) as e:
                     logger.warning(f"Connection lost, reconnecting... {e}")
@@ -74,17 +94,7 @@ class MongoDB:
                     logger.info(
                         f"Reconnection attempt {attempt + 1}/{self._retry_count}"
                     )
-                    self._client = AsyncIOMotorClient(
-                        MONGO_URI,
-                        maxPoolSize=100,
-                        minPoolSize=10,
-                        connectTimeoutMS=5000,
-                        serverSelectionTimeoutMS=5000,
-                        socketTimeoutMS=30000,
-                        retryWrites=True,
-                        retryReads=True,
-                    )
-                    self._db = self._client[DB_MONGO_NAME]
+                    self._set_client(self._create_client())
                     # Проверяем новое соединение
                     await self._client.admin.command("ping")
                     self._is_connected = True
@@ -99,6 +109,18 @@ class MongoDB:
                         return False
             return False
 
+    @property
+    def is_connected(self) -> bool:
+        """Было ли соединение установлено и не потеряно с тех пор."""
+        return self._is_connected
+
+    def mark_disconnected(self) -> None:
+        """
+        Помечает соединение потерянным, следующий запрос
+        проверит его и при необходимости переподключится.
+        """
+        self._is_connected = False
+
     def get_client(self) -> AsyncIOMotorClient:
         """Возвращает клиент MongoDB."""
         return self._client
@@ -122,8 +144,26 @@ mongodb = MongoDB()
 
 async def get_db():
     """
-    Возвращает экземпляр базы данных с проверкой соединения.
+    Возвращает экземпляр базы данных.
+    Пока соединение не потеряно, запрос не проверяет его и не ждет
+    блокировку: сбои отдельных операций motor повторяет сам
+    (retryReads, retryWrites), а соединение проверяет heartbeat.
     """
+    if mongodb.is_connected:
+        return mongodb.get_db()
     if not await mongodb.ensure_connection():
         raise ConnectionError("Unable to connect to MongoDB")
     return mongodb.get_db()
+
+
+async def heartbeat(interval: float) -> None:
+    """
+    Фоновая задача: раз в interval секунд проверяет соединение
+    и переподключается, если проверка не прошла.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await mongodb.ensure_connection()
+        except Exception as e:
+            logger.error(f"MongoDB heartbeat failed: {e}")
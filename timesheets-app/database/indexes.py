@@ -0,0 +1,39 @@
+"""We describe the indexes of the collections."""
+
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+INDEXES: dict[str, list[IndexModel]] = {
+    "salaries": [
+        IndexModel(
+            [("user_id", ASCENDING), ("date", ASCENDING)],
+            unique=True,
+            name="unique_user_date",
+        ),
+        # Выборка смен за месяц по периоду (aggregate_data).
+        IndexModel(
+            [("user_id", ASCENDING), ("date", ASCENDING), ("period", ASCENDING)],
+            name="user_date_period",
+        ),
+    ],
+    "users_settings": [
+        IndexModel([("user_id", ASCENDING)], unique=True, name="unique_user_id"),
+    ],
+}
+
+
+async def create_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+    Создает индексы коллекций, существующие индексы не изменяются.
+    Ошибка создания индекса логируется и не мешает запуску приложения.
+    """
+    for name, indexes in INDEXES.items():
+        try:
+            await db.get_collection(name).create_indexes(indexes)
+        except PyMongoError as e:
+            logger.error(f"Failed to create indexes for {name}: {e}")
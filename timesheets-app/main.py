@@ -1,14 +1,41 @@
+import asyncio
 import logging
 import sys
 import os
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.logger import logger as fastapi_logger
+from pymongo.errors import ConnectionFailure
 
 from routes.settings import settings_router
 from routes.shifts import shift_router
 from routes.statistic import statistic
+from config import MONGO_HEARTBEAT_INTERVAL
+from database.db_conf import get_db, heartbeat, mongodb
+from database.indexes import create_indexes
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Connect the worker to MongoDB and create the indexes once when
+    the worker starts, check the connection in the background while
+    the worker runs and close the connection pool on shutdown.
+    """
+    mongodb.connect()
+    try:
+        await create_indexes(await get_db())
+    except ConnectionError as e:
+        logger.error(f"Indexes were not created: {e}")
+
+    heartbeat_task = asyncio.create_task(heartbeat(MONGO_HEARTBEAT_INTERVAL))
+    yield
+    heartbeat_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await heartbeat_task
+    await mongodb.close()
 
 
 app = FastAPI(
@@ -20,6 +47,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 logging.basicConfig(
@@ -51,6 +79,25 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+@app.exception_handler(ConnectionError)
+@app.exception_handler(ConnectionFailure)
+async def database_unavailable(
+    request: Request, exc: ConnectionError | ConnectionFailure
+):
+    """
+    The request failed because MongoDB is unreachable: the next request
+    checks the connection before using it.
+    """
+    logger.error(f"[Worker {worker_id}] MongoDB is unavailable: {exc}")
+    mongodb.mark_disconnected()
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": {"result": False, "description": "База данных недоступна."}
+        },
+    )
+
+
 app.include_router(settings_router)
 app.include_router(shift_router)
 app.include_router(statistic)
@@ -8,7 +8,7 @@ from utils.salary import (
     earned_for_award,
     earned_per_shift,
     get_settings,
-    normalization_salary_for_month,
+    recalculate_salaries,
 )
 from utils.shifts import (
     add_shifts_for_month,
@@ -136,6 +136,4 @@ async def delete_shift_by_day_id(
     data: dict = await delete_record(day_id, db)
     user_id, date = data.get("user_id"), data.get("date")
     settings: tuple = await get_settings(user_id, db)
-    await normalization_salary_for_month(
-        user_id, settings, {"year": date.year, "month": date.month}, db
-    )
\ No newline at end of file
+    await recalculate_salaries(user_id, settings, date, db)
\ No newline at end of file
@@ -1,14 +1,12 @@
-import asyncio
-from datetime import datetime, UTC
+from datetime import datetime
 
 from fastapi import HTTPException
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
 from starlette import status
 
-from crud.many import add_many_shifts
+from crud.many import run_in_transaction, update_many_shifts
 from crud.settings import get_settings_user_by_id
 from crud.get_data import get_hours_for_month, get_salary_for_day, update_salary
-from crud.create import write_salary, delete_record
 from crud.statistics import get_information_for_month
 from utils.valute import get_valute_info
 from utils.calculate import calc_valute
@@ -114,24 +112,17 @@ async def earned_per_shift(
     time: float, user_id: int, date: str, db: AsyncIOMotorDatabase
 ) -> None:
     """
-    Generate the amount earned per shift.
+    Save the hours worked per shift and recalculate the salary
+    for it and for the following shifts of the month.
 
     :param db: Database.
     :param time: Hours worked.
     :param user_id: The user's ID.
     :param date: The date for recording.
-    :return: The earned amount for the month.
     """
     parse_date = datetime.strptime(date, "%Y-%m-%d")
     settings = await get_settings(user_id, db)
-    valute_data = await get_valute_info()
-    salary = await earned_calculation(settings, time, user_id, db, parse_date)
-    await asyncio.gather(
-        write_salary(salary, user_id, parse_date, valute_data, db),
-        normalization_salary_for_month(
-            user_id, settings, {"year": parse_date.year, "month": parse_date.month}, db
-        ),
-    )
+    await recalculate_salaries(user_id, settings, parse_date, db, {parse_date: time})
 
 
 async def critical_data(data: dict) -> tuple:
@@ -153,45 +144,64 @@ async def critical_data(data: dict) -> tuple:
     return data.get("base_hours"), data.get("_id"), data.get("date"), old_need_data
 
 
-async def normalization_salary_for_month(
-    user_id: int, settings: tuple, data: dict, db: AsyncIOMotorDatabase
+async def recalculate_salaries(
+    user_id: int,
+    settings: tuple,
+    start_date: datetime,
+    db: AsyncIOMotorDatabase,
+    new_hours: dict[datetime, float] | None = None,
 ) -> None:
     """
-    Recalculation of monthly salary as the hours may be
-    changed and the calculation may be incorrect.
+    Recalculate the salary of the month's shifts starting from the
+    changed date. Earlier shifts are not changed, only their hours are
+    summed to get the hours worked before the first recalculated shift.
+    The month is read and all shifts are saved by one ordered bulk write
+    in the same transaction, so a retried transaction recalculates the
+    month from fresh data.
 
     :param db: Database.
     :param user_id: The user's ID.
     :param settings: User settings.
-    :param data: Year and month data.
+    :param start_date: The earliest changed date of the month.
+    :param new_hours: Hours of created or changed shifts by date,
+                      all dates belong to the month of start_date.
     """
-    year = data.get("year", datetime.now(UTC).year)
-    month = data.get("month", datetime.now(UTC).month)
-    result: list[dict] = await get_information_for_month(user_id, year, month, db)
-    sorted_result: list[dict] = sorted(result, key=lambda x: x["date"])
     valute_data: dict[str, tuple[int, float]] = await get_valute_info()
 
-    total_hours = 0
-    salaries: list[dict] = []
-
-    for item in sorted_result:
-        time, day_id, date, old_data = await critical_data(item)
-        if old_data not in (-1, -2):
-            await delete_record(day_id, db)
-            salary = await recalculation_salary(
-                time=time,
-                user_id=user_id,
-                date=date,
-                valute_data=valute_data,
-                settings=settings,
-                total_hours=total_hours,
-                old_data=old_data,
-                db=db,
-            )
-            salaries.append(salary)
-        total_hours += float(time)
-
-    await add_many_shifts(salaries, db)
+    async def recalculate(session: AsyncIOMotorClientSession | None) -> None:
+        result: list[dict] = await get_information_for_month(
+            user_id, start_date.year, start_date.month, db, session
+        )
+        shifts: dict[datetime, dict] = {item["date"]: item for item in result}
+        for date, time in (new_hours or {}).items():
+            shift = shifts.setdefault(date, {"date": date})
+            shift.update(base_hours=time)
+            # A working shift replaces a vacation or sick day.
+            shift.pop("earned", None)
+
+        total_hours = 0
+        salaries: list[dict] = []
+        for day in sorted(shifts):
+            time, day_id, date, old_data = await critical_data(shifts[day])
+            if date >= start_date and old_data not in (-1, -2):
+                salary = await recalculation_salary(
+                    time=time,
+                    user_id=user_id,
+                    date=date,
+                    valute_data=valute_data,
+                    settings=settings,
+                    total_hours=total_hours,
+                    old_data=old_data,
+                    db=db,
+                )
+                if day_id is not None:
+                    salary.update(_id=day_id)
+                salaries.append(salary)
+            total_hours += float(time)
+
+        await update_many_shifts(salaries, db, session)
+
+    await run_in_transaction(db, recalculate)
 
 
 async def recalculation_salary(
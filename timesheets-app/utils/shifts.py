@@ -6,12 +6,7 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from crud.many import add_many_shifts
 from crud.statistics import get_information_for_month, get_info_by_date
 from crud.get_data import get_salary_for_day
-from utils.salary import (
-    get_settings,
-    normalization_salary_for_month,
-    recalculation_salary,
-)
-from utils.valute import get_valute_info
+from utils.salary import get_settings, recalculate_salaries
 
 
 async def get_shifts_for_month(
@@ -116,47 +111,32 @@ async def add_shifts_for_month(
     :return: None.
     """
     date_objects: list = [datetime.strptime(d, "%Y-%m-%d") for d in list_dates]
-    data = {"year": date_objects[0].year, "month": date_objects[0].month}
     sorted_dates = sorted(date_objects)
-    await save_shifts_all(user_id, time, sorted_dates, data, db)
+    await save_shifts_all(user_id, time, sorted_dates, db)
 
 
 async def save_shifts_all(
-    user_id: int, time: float, sorted_dates: list, data: dict, db: AsyncIOMotorDatabase
+    user_id: int, time: float, sorted_dates: list, db: AsyncIOMotorDatabase
 ) -> None:
     """
-    Calculation of salary based on the provided data and
-    sending it for saving in the database.
+    Save the shifts and recalculate the salary of each month
+    starting from its earliest new shift.
 
     :param db: Database.
-    :param data: A dictionary with information about the year and month.
     :param user_id: The user's ID.
     :param time: The number of hours.
     :param sorted_dates: A sorted list of dates.
     """
     try:
-        valute_data: dict[str, tuple[int, float]] = await get_valute_info()
         settings: tuple[float] = await get_settings(user_id, db)
+        months: dict[tuple[int, int], dict[datetime, float]] = {}
+        for d in sorted_dates:
+            months.setdefault((d.year, d.month), {})[d] = time
 
-        total_hours = 0
-        salaries: list[dict] = []
-        # We are creating a list for adding shifts en masse.
-        for i, d in enumerate(sorted_dates, 1):
-            salary = await recalculation_salary(
-                time=time,
-                user_id=user_id,
-                date=d,
-                valute_data=valute_data,
-                settings=settings,
-                total_hours=total_hours,
-                old_data={},
-                db=db,
+        for new_hours in months.values():
+            await recalculate_salaries(
+                user_id, settings, min(new_hours), db, new_hours
             )
-            total_hours += float(time)
-            salaries.append(salary)
-
-        await add_many_shifts(salaries, db)
-        await normalization_salary_for_month(user_id, settings, data, db)
 
     except Exception as e:
         raise HTTPException(
@@ -184,4 +164,11 @@ async def create_vacation_days(user_id, data, db: AsyncIOMotorDatabase):
             }
         )
     await add_many_shifts(salaries, db)
-    await normalization_salary_for_month(user_id, settings, data, db)
+    # Vacation may continue into the next month.
+    first_dates: dict[tuple[int, int], datetime] = {}
+    for salary in salaries:
+        date_ = salary["date"]
+        first_dates.setdefault((date_.year, date_.month), date_)
+
+    for start_date in first_dates.values():
+        await recalculate_salaries(user_id, settings, start_date, db)